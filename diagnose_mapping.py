@@ -27,18 +27,18 @@ Year: 2025-2026
    Перевіряє версію формату маппінгу (v1, v2.0, v2.1) та наявність статистики.
 """
 
+import io
 import json
+import os
 import sys
 import argparse
 import difflib
-import re
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 # Fix Unicode output on Windows (PyInstaller cp1252 issue)
 if sys.platform == 'win32' and getattr(sys.stdout, 'encoding', 'utf-8').lower().replace('-', '') != 'utf8':
-    import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
@@ -49,17 +49,31 @@ if sys.platform == 'win32' and getattr(sys.stdout, 'encoding', 'utf-8').lower().
 # Список директорій, де скрипт автоматично шукатиме файли результатів
 SEARCH_DIRS = [Path('.'), Path('output'), Path('result')]
 
+# Де шукати оригінал для верифікації тексту (у порядку пріоритету)
+_ORIGINAL_CANDIDATES = (Path('input.txt'), Path('output/input.txt'))
+
 # Глибина пошуку історії файлів (скільки останніх файлів сканувати)
 HISTORY_SEARCH_LIMIT = 20
 
 # Налаштування візуалізації (ширина таблиць та ліміти виводу)
 SEPARATOR_WIDTH = 96
 DIFF_LINE_LIMIT = 50
+DIFF_INPUT_LINE_LIMIT = DIFF_LINE_LIMIT * 4
 
 # Формати рядків для таблиць (f-strings templates)
 FMT_FILE_HEADER = "{:<10} | {:<40} | {:<8} | {:<20}"
 FMT_CAT_ROW     = "{:<30} | {:<12} | {:<12} | {:<10} | {:<15}"
 
+# ANSI-кольори рядків diff: '+' — зелений, '-' — червоний
+_ANSI_RESET = "\033[0m"
+_DIFF_COLORS = {'+': "\033[92m", '-': "\033[91m"}
+
+# Розмір блоку для пошуку першої розбіжності нормалізованого тексту
+_MISMATCH_BLOCK = 4096
+
+# Розмір блоку читання при побайтовому порівнянні файлів (Level 1)
+_COMPARE_CHUNK = 64 * 1024
+
 
 # ============================================================================
 # БЛОК 1: РОБОТА З JSON MAPPING (Аналіз та порівняння)
@@ -80,7 +94,7 @@ def find_latest_maps(n_files: int = 2) -> List[Path]:
         if d.exists():
             candidates.extend(d.glob("masking_map_*.json"))
     # Сортування: новіші файли (більший mtime) йдуть першими
-    candidates.sort(key=lambda f: f.stat().st_mtime, reverse=True)
+    candidates.sort(key=lambda f: f.stat().st_mtime_ns, reverse=True)
     return candidates
 
 
@@ -112,7 +126,7 @@ def analyze_category_structure(category_name: str, items: Dict[str, Any]) -> Dic
         return {"count": 0, "format": "empty", "has_instances": False}
 
     # Беремо перший елемент для визначення структури всієї категорії
-    first_value = list(items.values())[0]
+    first_value = next(iter(items.values()))
 
     if isinstance(first_value, str):
         return {
@@ -124,12 +138,18 @@ def analyze_category_structure(category_name: str, items: Dict[str, Any]) -> Dic
     elif isinstance(first_value, dict):
         has_instances = "instances" in first_value
 
-        # Збір статистики колізій (скільки разів маска повторюється)
-        all_instances = [len(v.get("instances", [])) for v in items.values() if isinstance(v, dict)]
-        instance_stats = {
-            "total_instances": sum(all_instances),
-            "max_instances": max(all_instances) if all_instances else 0
-        } if has_instances else {}
+        # Збір статистики колізій (скільки разів маска повторюється) — один прохід
+        instance_stats = {}
+        if has_instances:
+            total = 0
+            max_count = 0
+            for v in items.values():
+                if isinstance(v, dict):
+                    n = len(v.get("instances", ()))
+                    total += n
+                    if n > max_count:
+                        max_count = n
+            instance_stats = {"total_instances": total, "max_instances": max_count}
 
         return {
             "count": len(items),
@@ -260,19 +280,66 @@ def find_original_and_recovery() -> Tuple[Optional[Path], Optional[Path]]:
     """
     Шукає пару файлів для перевірки: input.txt та найсвіжіший input_recovery_*.txt.
     """
-    original = Path("input.txt")
-    if not original.exists():
-        original = Path("output/input.txt")
+    # Кожен кандидат перевіряється один раз; перший знайдений — оригінал
+    original = next((p for p in _ORIGINAL_CANDIDATES if p.exists()), None)
 
-    recovery_candidates = []
+    # Потрібен лише найсвіжіший файл: один прохід max() замість сортування,
+    # stat() береться з DirEntry (на Windows — без додаткового системного виклику)
+    latest_recovery = None
+    latest_mtime = -1
     for d in SEARCH_DIRS:
-        if d.exists():
-            recovery_candidates.extend(d.glob("input_recovery_*.txt"))
+        if not d.is_dir():
+            continue
+        with os.scandir(d) as entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.startswith("input_recovery_") and name.endswith(".txt")):
+                    continue
+                mtime = entry.stat().st_mtime_ns
+                if mtime > latest_mtime:
+                    latest_mtime = mtime
+                    latest_recovery = Path(entry.path)
+
+    return original, latest_recovery
+
+
+def _files_identical(path_a: Path, path_b: Path) -> bool:
+    """
+    Побайтове порівняння двох файлів блоками, з виходом на першій розбіжності.
 
-    recovery_candidates.sort(key=lambda f: f.stat().st_mtime, reverse=True)
-    latest_recovery = recovery_candidates[0] if recovery_candidates else None
+    Різний розмір — одразу False; у пам'яті одночасно лише по одному блоку з кожного файлу.
+    """
+    if os.stat(path_a).st_size != os.stat(path_b).st_size:
+        return False
+    with open(path_a, 'rb') as fa, open(path_b, 'rb') as fb:
+        while True:
+            chunk_a = fa.read(_COMPARE_CHUNK)
+            if chunk_a != fb.read(_COMPARE_CHUNK):
+                return False
+            if not chunk_a:
+                return True
+
+
+def _count_lines(text: str) -> int:
+    """
+    Кількість рядків так, як її повернув би readlines(), без створення списку рядків.
+    """
+    return text.count('\n') + (1 if text and not text.endswith('\n') else 0)
 
-    return (original if original.exists() else None), latest_recovery
+
+def _first_mismatch(a: str, b: str, limit_len: int) -> int:
+    """
+    Позиція першого символу, що відрізняється в межах limit_len, або -1.
+
+    Блоки порівнюються зрізами (у C), посимвольно — лише блок з розбіжністю.
+    """
+    for start in range(0, limit_len, _MISMATCH_BLOCK):
+        end = min(start + _MISMATCH_BLOCK, limit_len)
+        if a[start:end] != b[start:end]:
+            for i in range(start, end):
+                if a[i] != b[i]:
+                    return i
+    return -1
 
 
 def verify_text_recovery(original_path: Path, recovery_path: Path, ignore_flags: bool = False) -> None:
@@ -298,21 +365,18 @@ def verify_text_recovery(original_path: Path, recovery_path: Path, ignore_flags:
     print("-" * SEPARATOR_WIDTH)
 
     try:
-        with open(original_path, 'r', encoding='utf-8') as f1, \
-                open(recovery_path, 'r', encoding='utf-8') as f2:
-            content_orig = f1.read()
-            content_rec = f2.read()
-
-            # Перемотуємо на початок для генерації diff
-            f1.seek(0)
-            f2.seek(0)
-            lines_orig = f1.readlines()
-            lines_rec = f2.readlines()
+        # Побайтово ідентичні файли (типовий успішний випадок) — без декодування
+        if _files_identical(original_path, recovery_path):
+            print("\n✅ [LEVEL 1] Файли ідентичні (Byte-to-byte match).")
+            return
+        content_orig = Path(original_path).read_text(encoding='utf-8')
+        content_rec = Path(recovery_path).read_text(encoding='utf-8')
     except (FileNotFoundError, PermissionError, OSError, UnicodeDecodeError) as e:
         print(f"❌ Помилка читання файлів: {e}")
         return
 
     # --- РІВЕНЬ 1: Strict ---
+    # Текст збігається після уніфікації переносів рядків (\r\n / \n)
     if content_orig == content_rec:
         print("\n✅ [LEVEL 1] Файли ідентичні (Byte-to-byte match).")
         return
@@ -320,19 +384,18 @@ def verify_text_recovery(original_path: Path, recovery_path: Path, ignore_flags:
     print("\n❌ [LEVEL 1] Сувора перевірка не пройшла. Файли мають відмінності.")
 
     # --- РІВЕНЬ 2: Normalized Newlines ---
-    # Логіка: Замінюємо всі переноси рядків на один пробіл.
-    # Потім схлопуємо множинні пробіли в один.
-    orig_norm = re.sub(r'[\n\r]+', ' ', content_orig)
-    rec_norm = re.sub(r'[\n\r]+', ' ', content_rec)
-
-    orig_norm = re.sub(r'\s+', ' ', orig_norm).strip()
-    rec_norm = re.sub(r'\s+', ' ', rec_norm).strip()
+    # Логіка: Будь-яка послідовність whitespace (включно з переносами рядків)
+    # схлопується в один пробіл, краї обрізаються — один прохід split() замість двох re.sub.
+    orig_norm = " ".join(content_orig.split())
+    rec_norm = " ".join(content_rec.split())
 
     if orig_norm == rec_norm:
-        lines_diff = len(lines_orig) - len(lines_rec)
+        count_orig = _count_lines(content_orig)
+        count_rec = _count_lines(content_rec)
+        lines_diff = count_orig - count_rec
         print("✅ [LEVEL 2] Текст збігається при ігноруванні переносів рядків.")
-        print(f"   📉 В оригіналі: {len(lines_orig)} рядків")
-        print(f"   📈 Відновлено:  {len(lines_rec)} рядків")
+        print(f"   📉 В оригіналі: {count_orig} рядків")
+        print(f"   📈 Відновлено:  {count_rec} рядків")
 
         if lines_diff > 0:
             print(f"   ✂️  Склеєно (втрачено) переносів: {lines_diff}")
@@ -345,11 +408,7 @@ def verify_text_recovery(original_path: Path, recovery_path: Path, ignore_flags:
 
         # Діагностика для Level 2: показати першу розбіжність
         limit_len = min(len(orig_norm), len(rec_norm))
-        diff_idx = -1
-        for i in range(limit_len):
-            if orig_norm[i] != rec_norm[i]:
-                diff_idx = i
-                break
+        diff_idx = _first_mismatch(orig_norm, rec_norm, limit_len)
 
         if diff_idx != -1:
             print(f"   🔍 Перша розбіжність нормалізованого тексту на позиції {diff_idx}:")
@@ -366,8 +425,9 @@ def verify_text_recovery(original_path: Path, recovery_path: Path, ignore_flags:
 
     # --- РІВЕНЬ 3: Skeleton ---
     # Видаляємо ВЗАГАЛІ всі whitespace. Перевірка тільки контенту (букви, цифри).
-    skeleton_orig = "".join(content_orig.split())
-    skeleton_rec = "".join(content_rec.split())
+    # Нормалізований текст уже містить лише одиночні пробіли між токенами.
+    skeleton_orig = orig_norm.replace(" ", "")
+    skeleton_rec = rec_norm.replace(" ", "")
 
     if skeleton_orig == skeleton_rec:
         print("✅ [LEVEL 3] 'Скелет' тексту збігається (дані збережені, форматування втрачено).")
@@ -380,6 +440,25 @@ def verify_text_recovery(original_path: Path, recovery_path: Path, ignore_flags:
     print("📝 DIFF (Деталі розбіжностей)")
     print(f"{'─' * SEPARATOR_WIDTH}")
 
+    # Рядки потрібні лише для diff — будуємо їх з уже прочитаного тексту.
+    # StringIO.readlines() ділить лише по '\n', як і readlines() файлу
+    # (на відміну від splitlines(), що ріже ще й по \f, \v, \u2028 тощо).
+    lines_orig = io.StringIO(content_orig).readlines()
+    lines_rec = io.StringIO(content_rec).readlines()
+
+    # Вивід обрізається до DIFF_LINE_LIMIT, тому difflib (квадратичний у гіршому
+    # випадку) отримує лише спільний початок + DIFF_INPUT_LINE_LIMIT рядків після нього.
+    common = 0
+    for line_o, line_r in zip(lines_orig, lines_rec):
+        if line_o != line_r:
+            break
+        common += 1
+    cut = common + DIFF_INPUT_LINE_LIMIT
+    if len(lines_orig) > cut or len(lines_rec) > cut:
+        print(f"   (diff побудовано лише для перших {cut} рядків)")
+        lines_orig = lines_orig[:cut]
+        lines_rec = lines_rec[:cut]
+
     diff = difflib.unified_diff(
         lines_orig,
         lines_rec,
@@ -388,21 +467,24 @@ def verify_text_recovery(original_path: Path, recovery_path: Path, ignore_flags:
         lineterm=''
     )
 
-    diff_lines = list(diff)
+    # Генератор читається поступово: у пам'яті лише рядки, що виводяться,
+    # решта тільки рахується для повідомлення про приховані рядки.
+    write = sys.stdout.write
+    shown = 0
+    for line in diff:
+        if shown >= DIFF_LINE_LIMIT:
+            hidden = 1 + sum(1 for _ in diff)
+            print(f"\n... ще {hidden} рядків приховано ...")
+            break
+        shown += 1
+        color = _DIFF_COLORS.get(line[:1])
+        if color:
+            write(color + line.rstrip() + _ANSI_RESET + "\n")
+        else:
+            write(line.rstrip() + "\n")
 
-    if not diff_lines:
+    if not shown:
         print("   (Difflib не зміг візуалізувати різницю)")
-    else:
-        for i, line in enumerate(diff_lines):
-            if i >= DIFF_LINE_LIMIT:
-                print(f"\n... ще {len(diff_lines) - DIFF_LINE_LIMIT} рядків приховано ...")
-                break
-            if line.startswith('+'):
-                print(f"\033[92m{line.rstrip()}\033[0m") # Зелений
-            elif line.startswith('-'):
-                print(f"\033[91m{line.rstrip()}\033[0m") # Червоний
-            else:
-                print(line.rstrip())
 
 
 # ============================================================================
@@ -69,6 +69,13 @@ except ImportError:
     PASSWORD_GENERATOR_AVAILABLE = False
     _opt_logger.debug("modules.password_generator not available — password generation disabled")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _opt_logger.debug("orjson not available — mapping is written with json")
+
 
 # ============================================================================
 # UTILITY FUNCTIONS
@@ -348,11 +355,10 @@ def _read_input(input_path: Path, is_json: bool, logger):
     """Read input file (JSON or text)."""
     try:
         validate_file_size(input_path)
-        with open(input_path, 'r', encoding='utf-8', newline='') as f:
-            if is_json:
-                return json.load(f)
-            else:
-                return f.read()
+        # Один виклик decode замість потокового TextIOWrapper; без перетворення
+        # переносів рядків, як і newline='' раніше
+        text = input_path.read_bytes().decode('utf-8')
+        return json.loads(text) if is_json else text
     except (FileNotFoundError, PermissionError, OSError, json.JSONDecodeError,
             UnicodeDecodeError, ValueError) as e:
         print(f"Error reading file: {e}")
@@ -468,6 +474,21 @@ def _print_generated_password(password: str) -> None:
     print(f"  {password}", file=sys.stderr)
 
 
+def _write_mapping_json(map_path: Path, masking_dict: Dict) -> None:
+    """Write the mapping JSON (orjson if available; same bytes as json.dump)."""
+    if ORJSON_AVAILABLE:
+        try:
+            data = orjson.dumps(masking_dict, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass  # тип, який orjson не кодує — пишемо через json
+        else:
+            with open(map_path, 'wb') as f:
+                f.write(data)
+            return
+    with open(map_path, 'w', encoding='utf-8') as f:
+        json.dump(masking_dict, f, ensure_ascii=False, indent=2)
+
+
 def _handle_encryption(args, config, masking_dict: Dict, map_path: Path,
                        logger) -> None:
     """Encrypt the mapping file if --encrypt is requested."""
@@ -603,16 +624,15 @@ def _save_results(masked_data, is_json: bool, masking_dict: Dict,
     re_mask_passes = getattr(args, 're_mask', None)
 
     try:
-        with open(output_path, 'w', encoding='utf-8', newline='') as f:
-            if is_json:
+        if is_json:
+            with open(output_path, 'w', encoding='utf-8', newline='') as f:
                 json.dump(masked_data, f, ensure_ascii=False, indent=2)
-            else:
-                f.write(masked_data)
+        else:
+            output_path.write_bytes(masked_data.encode('utf-8'))
 
         # Save mapping (single-pass only; chain saves its own file)
         if not (REMASK_AVAILABLE and re_mask_passes and re_mask_passes > 1):
-            with open(map_path, 'w', encoding='utf-8') as f:
-                json.dump(masking_dict, f, ensure_ascii=False, indent=2)
+            _write_mapping_json(map_path, masking_dict)
 
             _handle_encryption(args, config, masking_dict, map_path, logger)
 
@@ -75,9 +75,10 @@ _MONTHS_UA = (
     r'липня|серпня|вересня|жовтня|листопада|грудня'
 )
 DATE_TEXT_PATTERN = re.compile(
+    r'(?:(?<!\s)|(?!\s))'                 # not inside a whitespace run (linear scan)
     r'(?:["\u201c\u201e«]?\s*)?'         # optional opening quote
     r'(\d{1,2})'                          # day
-    r'(?:\s*["\u201d\u201c»]?\s*)'        # optional closing quote + space
+    r'\s*(?:["\u201d\u201c»]\s*)?'        # optional closing quote + space
     r'(' + _MONTHS_UA + r')'              # month name
     r'\s+(\d{4})'                         # year
     r'(?:\s+року)?',                      # optional "року"
@@ -8,21 +8,66 @@ Extracted from data_masking.py during the package refactoring (v2.5.0).
 """
 
 import re
+import string
 from typing import Dict, Optional, Tuple
 
 from masking import constants as _cfg
 from masking.helpers import normalize_string, normalize_identifier, is_pib_anchor
 from masking.language import looks_like_name
 
+# Ідентифікатори в рядку (ІПН | паспорт | військовий ID) — одне об'єднане
+# скомпільоване регулярне замість трьох окремих проходів по рядку
+_IDENTIFIER_RE = re.compile(r'\b\d{10}\b|\b\d{9}\b|[А-ЯA-Z]{2}\s*(?:-\s*)?\d{6}\b')
+# Заголовок-мітка на весь рядок: "ВИСНОВОК:", "ПІБ:"
+_HEADER_LINE_RE = re.compile(r'^[А-ЯҐЄІЇA-Z\s]+:\s*$')
+# Уточнення до звання: вид служби та статус ("майор юстиції у запасі")
+_SERVICE_TYPE_RE = re.compile(r'медичної служби|юстиції', re.IGNORECASE)
+_RANK_STATUS_RE = re.compile(r'у відставці|в запасі|у запасі|на пенсії|в резерві|у резерві', re.IGNORECASE)
+# Контекст після № / БР (analyze_number_sign_context, analyze_br_keyword)
+_BR_PREFIX_RE = re.compile(r'\s*БР', re.IGNORECASE)
+_BR_AFTER_RE = re.compile(r'\s*БР[-\s]?(\d+(?:[/-]\d+)*(?:[/-][А-Яа-яA-Za-z]+)*)', re.IGNORECASE)
+_NUM_AFTER_RE = re.compile(r'\s*(\d+(?:[/-]\d+)*(?:[/-][А-Яа-яA-Za-z]+|[А-Яа-яA-Za-z]+)?)')
+_BR_SUFFIX_RE = re.compile(r'(дск|п|к)$', re.IGNORECASE)
+_HAS_LETTER_RE = re.compile(r'[А-Яа-яA-Za-z]')
+_BR_KEYWORD_AFTER_RE = re.compile(r'[-\s]?(\d+(?:[/-]\d+)*(?:дск|п|к)?)', re.IGNORECASE)
+# Шум на початку/всередині рядка перед розбором (clean_line_before_parsing)
+_ITEM_NUMBERING_RE = re.compile(r'^\s*(?:\d+\.)+\s*')
+_DATE_NOISE_RE = re.compile(r'\d{1,2}[.!]\d{1,2}\.\d{4}')
+# (?<!\s): збіг починається лише на початку пробільного проміжку — той самий
+# результат sub, але без квадратичного перебору всередині довгих проміжків
+_ROKU_RE = re.compile(r'(?<!\s)\s+року\s+', re.IGNORECASE)
+# Юридичні терміни (короткий рядок з ними — посилання на документ, не ПІБ)
+_IDENTIFIER_PREFIX_CHARS = frozenset(
+    string.ascii_letters
+    + ''.join(chr(c) for c in range(ord('А'), ord('я') + 1))
+    + 'ІіЇїЄєΐё'
+)
+_SEPARATOR_STARTS = ('===', '---')
+# Статус після звання: "у відставці", "в запасі", "на пенсії"
+_STATUS_PREPOSITIONS = frozenset({'у', 'в', 'на'})
+_STATUS_WORDS = frozenset({'відставці', 'запасі', 'пенсії', 'резерві'})
+_EXCLUDE_LINE_STARTS = ('відповідно', 'згідно', 'на підставі')
+_LEGAL_TERMS_RE = re.compile('статуту|кодексу|закону|указу')
+# Основи слів, які не можуть входити до ПІБ
+_BAD_PIB_WORDS_RE = re.compile('статут|наказ|вимог|порушення|служби|закон|указ|кодекс|положення')
+# Усі форми звань одним автоматом (порядок ALL_RANK_FORMS зберігається):
+# один прохід по рядку замість find() для кожної з ~200 форм
+_RANK_FORMS_RE = re.compile('|'.join(re.escape(form + ' ') for form in _cfg.ALL_RANK_FORMS))
+# Коротший рядок не вмістить найкоротшу форму звання з пробілом після неї
+_MIN_RANK_FORM_LEN = min(len(form) for form in _cfg.ALL_RANK_FORMS)
+# Чи є в рядку хоч одне звання з RANKS_LIST — потрібна лише наявність
+_RANKS_LIST_RE = re.compile('|'.join(re.escape(rank) for rank in _cfg.RANKS_LIST))
+
 
 def analyze_number_sign_context(text: str, match: re.Match) -> Optional[Dict]:
     """Аналізує контекст після символу №"""
+    # Контекст — до 100 символів після №; pos/endpos замість зрізу рядка
     pos = match.end()
-    after_text = text[pos:pos+100]
+    window_end = pos + 100
 
     # 1. №БР...
-    if re.match(r'\s*БР', after_text, re.IGNORECASE):
-        br_match = re.match(r'\s*БР[-\s]?(\d+(?:[/-]\d+)*(?:[/-][А-Яа-яA-Za-z]+)*)', after_text, re.IGNORECASE)
+    if _BR_PREFIX_RE.match(text, pos, window_end):
+        br_match = _BR_AFTER_RE.match(text, pos, window_end)
         if br_match:
             full_text = text[match.start():match.end() + len(br_match.group(0))]
             return {
@@ -34,7 +79,7 @@ def analyze_number_sign_context(text: str, match: re.Match) -> Optional[Dict]:
             }
 
     # 2. № 123...
-    number_match = re.match(r'\s*(\d+(?:[/-]\d+)*(?:[/-][А-Яа-яA-Za-z]+|[А-Яа-яA-Za-z]+)?)', after_text)
+    number_match = _NUM_AFTER_RE.match(text, pos, window_end)
     if not number_match:
         return None
 
@@ -42,14 +87,14 @@ def analyze_number_sign_context(text: str, match: re.Match) -> Optional[Dict]:
     full_text = text[match.start():match.end() + len(number_match.group(0))]
 
     # 3. № 123дск
-    if re.search(r'(дск|п|к)$', number_text, re.IGNORECASE):
+    if _BR_SUFFIX_RE.search(number_text):
         if number_text.count('/') >= 2:
             return {'type': 'br_with_slashes', 'full_text': full_text, 'number_part': number_text, 'start': match.start(), 'end': match.end() + len(number_match.group(0))}
         else:
             return {'type': 'br_with_suffix', 'full_text': full_text, 'number_part': number_text, 'start': match.start(), 'end': match.end() + len(number_match.group(0))}
 
     # 4. № 123/ОКП
-    if re.search(r'[А-Яа-яA-Za-z]', number_text):
+    if _HAS_LETTER_RE.search(number_text):
         return {'type': 'order_with_letters', 'full_text': full_text, 'number_part': number_text, 'start': match.start(), 'end': match.end() + len(number_match.group(0))}
 
     # 5. № 123
@@ -58,8 +103,7 @@ def analyze_number_sign_context(text: str, match: re.Match) -> Optional[Dict]:
 def analyze_br_keyword(text: str, match: re.Match) -> Optional[Dict]:
     """Аналізує контекст після слова БР"""
     pos = match.end()
-    after_text = text[pos:pos+100]
-    br_match = re.match(r'[-\s]?(\d+(?:[/-]\d+)*(?:дск|п|к)?)', after_text, re.IGNORECASE)
+    br_match = _BR_KEYWORD_AFTER_RE.match(text, pos, pos + 100)
     if br_match:
         return {
             'type': 'br_standalone',
@@ -71,46 +115,49 @@ def analyze_br_keyword(text: str, match: re.Match) -> Optional[Dict]:
     return None
 
 def clean_line_before_parsing(line: str) -> str:
-    # Видаляємо нумерацію пунктів на початку рядка: "20.1.2.1.", "1.", "1.2.", "3.2." тощо
-    line = re.sub(r'^\s*(?:\d+\.)+\s*', '', line)
-    line = re.sub(r'\d{1,2}[.!]\d{1,2}\.\d{4}', '', line)
-    line = re.sub(r'\s+року\s+', ' ', line, flags=re.IGNORECASE)
-    line = re.sub(r'\s+', ' ', line)
-    return line.strip()
+    # Нумерація пунктів ("20.1.2.1.", "1.", "3.2.") та дати містять крапку:
+    # без неї обидва sub нічого не змінять, тож рядок не переглядаємо
+    if '.' in line:
+        line = _ITEM_NUMBERING_RE.sub('', line)
+        line = _DATE_NOISE_RE.sub('', line)
+    line = _ROKU_RE.sub(' ', line)
+    # split() ділить за тими ж пробільними символами, що й \s, тож це
+    # дорівнює sub(r'\s+', ' ') + strip() за один прохід без regex
+    return ' '.join(line.split())
+
+def _looks_like_identifier(word: str) -> bool:
+    # Те саме, що ^[A-Za-zА-Яа-яІіЇїЄєΐё]*\d+[\w\-]*$, без входу в regex:
+    # літерний префікс, далі цифра, далі лише \w та '-'
+    i, n = 0, len(word)
+    while i < n and word[i] in _IDENTIFIER_PREFIX_CHARS: i += 1
+    if i == n or not word[i].isdecimal(): return False
+    tail = word[i + 1:].replace('-', '').replace('_', '')
+    return not tail or tail.isalnum()
 
 def extract_identifier_from_line(line: str) -> Optional[str]:
     words = line.strip().split()
     if not words: return None
     last_word = words[-1]
-    if re.match(r'^[A-Za-zА-Яа-яІіЇїЄєΐё]*\d+[\w\-]*$', last_word):
+    if _looks_like_identifier(last_word):
         return normalize_identifier(last_word)
     return None
 
 def extract_base_rank(full_rank_text: str) -> Tuple[str, str]:
     if not full_rank_text: return full_rank_text, ""
-    service_type_phrases = ['медичної служби', 'юстиції']
-    status_phrases = ['у відставці', 'в запасі', 'у запасі', 'на пенсії', 'в резерві', 'у резерві']
-    full_rank_lower = full_rank_text.lower()
     base_rank = full_rank_text
     additional_parts = []
 
-    for phrase in service_type_phrases:
-        if phrase in full_rank_lower:
-            phrase_index = full_rank_lower.find(phrase)
-            base_rank = full_rank_text[:phrase_index].strip()
-            additional_parts.append(full_rank_text[phrase_index:phrase_index + len(phrase)])
-            remaining_text = full_rank_text[phrase_index + len(phrase):].strip()
-            full_rank_lower = remaining_text.lower()
-            full_rank_text = remaining_text
-            break
+    service_match = _SERVICE_TYPE_RE.search(full_rank_text)
+    if service_match:
+        base_rank = full_rank_text[:service_match.start()].strip()
+        additional_parts.append(service_match.group(0))
+        full_rank_text = full_rank_text[service_match.end():].strip()
 
-    for phrase in status_phrases:
-        if phrase in full_rank_lower:
-            if not additional_parts:
-                phrase_index = full_rank_text.lower().find(phrase)
-                base_rank = full_rank_text[:phrase_index].strip()
-            additional_parts.append(full_rank_text[full_rank_text.lower().find(phrase):full_rank_text.lower().find(phrase) + len(phrase)])
-            break
+    status_match = _RANK_STATUS_RE.search(full_rank_text)
+    if status_match:
+        if not additional_parts:
+            base_rank = full_rank_text[:status_match.start()].strip()
+        additional_parts.append(status_match.group(0))
 
     additional = ' '.join(additional_parts) if additional_parts else ""
     return base_rank, additional
@@ -120,23 +167,21 @@ def looks_like_pib_line(line: str) -> bool:
     line_clean = line.strip()
     line_lower = line_clean.lower()
 
-    if line_clean.startswith('===') or line_clean.startswith('---') or re.match(r'^[А-ЯҐЄІЇA-Z\s]+:\s*$', line_clean): return False
+    if line_clean.startswith(_SEPARATOR_STARTS) or _HEADER_LINE_RE.match(line_clean): return False
 
     normalized = normalize_string(line_clean)
-    has_rank = any(rank in normalized for rank in _cfg.RANKS_LIST)
+    has_rank = _RANKS_LIST_RE.search(normalized) is not None
 
+    # Результат пошуку ідентифікатора використовуємо повторно в кінці функції
+    has_identifier = None
     if not has_rank:
         if line_clean.isupper() and len(line_clean.split()) >= 3:
-            if not re.search(r'\b\d{10}\b|\b\d{9}\b|[А-ЯA-Z]{2}\s*-?\s*\d{6}\b', line_clean): return False
+            has_identifier = _IDENTIFIER_RE.search(line_clean) is not None
+            if not has_identifier: return False
 
-    exclude_starts = ['відповідно', 'згідно', 'на підставі']
-    for start in exclude_starts:
-        if line_lower.startswith(start): return False
+    if line_lower.startswith(_EXCLUDE_LINE_STARTS): return False
 
-    if len(line_clean) < 100:
-        legal_terms = ['статуту', 'кодексу', 'закону', 'указу']
-        for term in legal_terms:
-            if term in line_lower: return False
+    if len(line_clean) < 100 and _LEGAL_TERMS_RE.search(line_lower): return False
 
     if has_rank: return True
 
@@ -152,8 +197,8 @@ def looks_like_pib_line(line: str) -> bool:
             capitalize_sequence = 0
 
     if max_sequence >= 2: return True
-    if re.search(r'\b\d{10}\b|\b\d{9}\b|[А-ЯA-Z]{2}\s*-?\s*\d{6}\b', line_clean): return True
-    return False
+    if has_identifier is None: has_identifier = _IDENTIFIER_RE.search(line_clean) is not None
+    return has_identifier
 
 def parse_hybrid_line(line: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     line = line.strip()
@@ -168,39 +213,37 @@ def parse_hybrid_line(line: str) -> Tuple[Optional[str], Optional[str], Optional
     if parts and parts[0].isdigit(): parts = parts[1:]
     if not parts: return None, None, identifier
 
-    normalized_line = normalize_string(line)
     pib_start_index = -1
     found_rank = None
     found_rank_original_case = None
     rank_position = -1
-    rank_matches = []
-
-    for rank_form in _cfg.ALL_RANK_FORMS:
-        rank_pattern = rank_form + ' '
-        rank_index = normalized_line.find(rank_pattern)
-        if rank_index != -1:
-            words_before_rank = normalized_line[:rank_index].split()
-            rank_word_count = len(rank_form.split())
-            words_after = normalized_line[rank_index + len(rank_pattern):].split()
-            additional_words = 0
-
-            if len(words_after) >= 2:
-                two_words = ' '.join(words_after[:2])
-                if two_words == 'медичної служби':
-                    additional_words += 2
-                    words_after = words_after[2:]
-            if words_after and words_after[0] == 'юстиції':
-                additional_words += 1
-                words_after = words_after[1:]
-            if words_after and words_after[0] in ['у', 'в', 'на']:
-                if len(words_after) > 1 and words_after[1] in ['відставці', 'запасі', 'пенсії', 'резерві']:
-                    additional_words += 2
-
-            rank_matches.append((rank_index, rank_form, len(words_before_rank), rank_word_count + additional_words))
-
-    if rank_matches:
-        rank_matches.sort(key=lambda x: x[0])
-        rank_index, found_rank, rank_position, rank_word_count = rank_matches[0]
+
+    # Найлівіше входження будь-якої форми звання; при однаковій позиції
+    # перемагає раніша форма ALL_RANK_FORMS (довша) — як і при переборі.
+    # Нормалізуємо лише рядки, у які звання взагалі може поміститися
+    rank_match = None
+    if len(line) > _MIN_RANK_FORM_LEN:
+        normalized_line = normalize_string(line)
+        rank_match = _RANK_FORMS_RE.search(normalized_line)
+    if rank_match:
+        rank_index = rank_match.start()
+        found_rank = rank_match.group(0)[:-1]
+        rank_position = len(normalized_line[:rank_index].split())
+        rank_word_count = len(found_rank.split())
+        words_after = normalized_line[rank_match.end():].split()
+        additional_words = 0
+
+        if len(words_after) >= 2 and words_after[0] == 'медичної' and words_after[1] == 'служби':
+            additional_words += 2
+            words_after = words_after[2:]
+        if words_after and words_after[0] == 'юстиції':
+            additional_words += 1
+            words_after = words_after[1:]
+        if words_after and words_after[0] in _STATUS_PREPOSITIONS:
+            if len(words_after) > 1 and words_after[1] in _STATUS_WORDS:
+                additional_words += 2
+
+        rank_word_count += additional_words
         pib_start_index = rank_position + rank_word_count
         rank_words = [w.strip(_cfg.QUOTE_CHARS) for w in
                       line.split()[rank_position:rank_position + rank_word_count]]
@@ -233,10 +276,7 @@ def parse_hybrid_line(line: str) -> Tuple[Optional[str], Optional[str], Optional
         if re.search(r'\d{2,}', rank_without_number): return None, None, identifier
     if pib and len(pib.split()) < 2: return None, None, identifier
     if pib:
-        pib_lower = pib.lower()
-        bad_words = ['статут', 'наказ', 'вимог', 'порушення', 'служби', 'закон', 'указ', 'кодекс', 'положення']
-        for bad_word in bad_words:
-            if bad_word in pib_lower: return None, None, identifier
+        if _BAD_PIB_WORDS_RE.search(pib.lower()): return None, None, identifier
     if rank and not pib and not identifier: return None, None, None
 
     return rank, pib, identifier
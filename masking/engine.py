@@ -9,7 +9,9 @@ Extracted from data_masking.py during the package refactoring (v2.5.0).
 
 import random
 import re
-from typing import Any, Dict
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 
 from masking import constants as _cfg
 from masking.context import (
@@ -28,13 +30,15 @@ from masking.mask_military import (
     mask_military_unit, mask_order_number, mask_order_number_with_letters,
     mask_br_number, mask_br_number_slash, mask_br_number_complex,
     mask_brigade_number, mask_date, _mask_date_text,
-    mask_rank_preserve_case, is_valid_date,
+    mask_rank_preserve_case, is_valid_date, _rank_mapping_key,
 )
 
 _UA_UPPER = "АБВГҐДЕЖЗІЙКЛМНОПРСТУФХЦЧШЩЮЯЄІЇҐ"
 
 _SURNAME_RE = r'[А-ЯІЇЄҐ][а-яіїєґ\'ʼ\-]{2,}'
-_SURNAME_UPPER_RE = r'[А-ЯІЇЄҐ]{3,}'
+# Лише від початку серії великих літер: старт усередині серії дав би той самий
+# збіг пізніше, а перебір кожного старту квадратичний на довгих серіях
+_SURNAME_UPPER_RE = r'(?<![А-ЯІЇЄҐ])[А-ЯІЇЄҐ]{3,}'
 _NAME_RE = r'(?:' + _SURNAME_RE + r'|' + _SURNAME_UPPER_RE + r')'
 
 # Пробіл у межах рядка (НЕ \s — щоб ініціали не склеювались
@@ -68,11 +72,12 @@ def _is_surname_candidate(word: str) -> bool:
     clean = word.rstrip(',.!?;:')
     if len(clean) < 3:
         return False
-    if clean.lower() in _cfg.ABBREVIATION_WHITELIST:
+    clean_lower = clean.lower()
+    if clean_lower in _cfg.ABBREVIATION_WHITELIST:
         return False
-    if clean.lower() in _cfg.EXCLUDE_WORDS_LOWER:
+    if clean_lower in _cfg.EXCLUDE_WORDS_LOWER:
         return False
-    if clean.lower() in _cfg.RANKS_LIST_LOWER:
+    if clean_lower in _cfg.RANKS_LIST_LOWER:
         return False
     if clean.isupper() and len(clean) >= 3:
         return True
@@ -183,12 +188,19 @@ _BROKEN_RANKS_RE = None
 def _get_broken_ranks_re():
     global _BROKEN_RANKS_RE
     if _BROKEN_RANKS_RE is None:
+        # ALL_RANK_FORMS уже відсортований від довших форм до коротших, тож
+        # у альтернації довша форма перевіряється раніше за свій префікс
         multi_word_ranks = [r for r in _cfg.ALL_RANK_FORMS if ' ' in r]
         if multi_word_ranks:
             patterns = [re.escape(r).replace(r'\ ', r'\s+') for r in multi_word_ranks]
             _BROKEN_RANKS_RE = re.compile(r'(?i)\b(' + '|'.join(patterns) + r')\b')
     return _BROKEN_RANKS_RE
 
+def _join_rank_words(match) -> str:
+    # Збіг починається й закінчується літерою (\b), тож split()/join
+    # дає те саме, що re.sub(r'\s+', ' ', ...), без виклику regex
+    return ' '.join(match.group(0).split())
+
 def normalize_broken_ranks(text: str) -> str:
     """
     Нормалізує розірвані звання у тексті (Bug Fix #15).
@@ -199,11 +211,7 @@ def normalize_broken_ranks(text: str) -> str:
     pattern = _get_broken_ranks_re()
     if pattern is None:
         return text
-
-    def replace_match(match):
-        return re.sub(r'\s+', ' ', match.group(0))
-
-    return pattern.sub(replace_match, text)
+    return pattern.sub(_join_rank_words, text)
 
 
 # Лапки (відкриваючі/закриваючі будь-якого стилю) для пошуку значень у лапках
@@ -251,6 +259,94 @@ def _mask_quoted_ranks(text: str, masking_dict: Dict, instance_counters: Dict) -
     return text
 
 
+class _SpanIndex:
+    """
+    Інтервали [start, end), відсортовані за початком. Інтервал, що перетинає
+    чи містить [start, end), починається не раніше ніж start - max_len, тож
+    перевіряється лише зріз між двома bisect, а не весь список.
+    """
+    __slots__ = ('_starts', '_ends', '_max_len')
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+        self._max_len = 0
+
+    def add(self, start: int, end: int) -> None:
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        if end - start > self._max_len: self._max_len = end - start
+
+    def overlaps(self, start: int, end: int) -> bool:
+        lo = bisect_right(self._starts, start - self._max_len)
+        hi = bisect_left(self._starts, end)
+        return any(self._ends[i] > start for i in range(lo, hi))
+
+    def contains(self, start: int, end: int) -> bool:
+        lo = bisect_left(self._starts, end - self._max_len)
+        hi = bisect_right(self._starts, start)
+        return any(self._ends[i] >= end for i in range(lo, hi))
+
+
+# Шаблони mask_text_context_aware компілюються один раз при імпорті
+_UKRAINIAN_DATE_RE = re.compile(_cfg.UKRAINIAN_DATE_PATTERN)
+# Номери статей/пунктів/частин/розділів — не маскуються
+_LEGAL_REFERENCE_RES = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(стате[йї]|стать[іеюя])\s+(\d+(?:\s*,\s*\d+)*)',
+    r'(пункт[уаиіеє])\s+(\d+(?:\s*,\s*\d+)*)',
+    r'(частин[аиюіеє])\s+(\d+(?:\s*,\s*\d+)*)',
+    r'(розділ[уаіеє])\s+(\d+(?:\s*,\s*\d+)*)',
+)]
+_DIGITS_RE = re.compile(r'\d+')
+_NUMBER_SIGN_RE = re.compile(r'№')
+# Те саме, що \bБР\b з IGNORECASE, але шаблон починається з класу символів:
+# re швидко пропускає текст до першої "Б", а межу слова перед нею перевіряє
+# lookbehind (попередній символ не \w) — утричі швидше на звичайному тексті
+_BR_KEYWORD_RE = re.compile(r'[Бб](?<!\w[Бб])[Рр]\b')
+# Шаблони ідентифікаторів. Їхні збіги взаємно не перетинаються (межі \b
+# та різна довжина цифрових блоків), тож одна альтернація з іменованими
+# групами дає ті самі збіги, що й окремі проходи для кожного типу
+_IDENTIFIER_PATTERNS = {
+    'ipn': r'\b\d{10}\b',
+    'passport_id': r'\b\d{9}\b',
+    'military_id': r'(?i:\b[A-ZА-Я]{2}[\s-]?\d{6}\b)',
+    'military_unit': r'\b[А-ЯA-Z]\d{4}\b',
+}
+
+@lru_cache(maxsize=None)
+def _identifier_scan_re(enabled: Tuple[str, ...]) -> re.Pattern:
+    # Окремий шаблон на кожен набір увімкнених прапорців MASK_*
+    return re.compile('|'.join(f'(?P<{item_type}>{_IDENTIFIER_PATTERNS[item_type]})' for item_type in enabled))
+
+
+def _mask_rank_cached(rank: str, cache: Dict, masking_dict: Dict, instance_counters: Dict) -> str:
+    """
+    mask_rank_preserve_case з кешем у межах одного виклику маскування.
+
+    Результат залежить лише від rank і вмісту таблиці звань, куди записи
+    тільки додаються, тож він дійсний, доки таблиця не виросла. Повтор
+    дописує входження до того ж запису, що й повний виклик.
+    """
+    rank_table = masking_dict["mappings"]["rank"]
+    cached = cache.get(rank)
+    if cached is not None and cached[2] == len(rank_table):
+        masked, key, _ = cached
+        if key is not None: add_to_mapping(masking_dict, instance_counters, "rank", key, rank_table[key]["masked_as"])
+        return masked
+
+    key = _rank_mapping_key(rank)
+    entry = rank_table.get(key)
+    seen = len(entry["instances"]) if entry is not None else -1
+    size = len(rank_table)
+    masked = mask_rank_preserve_case(rank, masking_dict, instance_counters)
+    if len(rank_table) == size:
+        # Нових записів немає: виклик або дописав одне входження до key, або нічого
+        grew = entry is not None and len(entry["instances"]) == seen + 1
+        cache[rank] = (masked, key if grew else None, size)
+    return masked
+
+
 def mask_text_context_aware(text: str, masking_dict: Dict, instance_counters: Dict) -> str:
     """
     Головна функція маскування тексту з контекстним аналізом.
@@ -266,71 +362,79 @@ def mask_text_context_aware(text: str, masking_dict: Dict, instance_counters: Di
     text = _mask_initials_pib(text, masking_dict, instance_counters)
 
     items_to_mask = []
-    items_to_skip = []
+    # Індекси інтервалів для перевірок перетину замість any() по списках.
+    # Для пропусків (повні дати, номери статей/пунктів) потрібні лише межі
+    mask_spans = _SpanIndex()
+    skip_spans = _SpanIndex()
 
     if not _cfg.MASK_DATES:
-        for match in re.finditer(_cfg.UKRAINIAN_DATE_PATTERN, text):
-            items_to_skip.append({'start': match.start(), 'end': match.end(), 'text': match.group(0), 'reason': 'full_date', 'type': 'date'})
-
-    legal_patterns = [
-        r'(стате[йї]|стать[іеюя])\s+(\d+(?:\s*,\s*\d+)*)',
-        r'(пункт[уаиіеє])\s+(\d+(?:\s*,\s*\d+)*)',
-        r'(частин[аиюіеє])\s+(\d+(?:\s*,\s*\d+)*)',
-        r'(розділ[уаіеє])\s+(\d+(?:\s*,\s*\d+)*)',
-    ]
-    for pattern in legal_patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            term, numbers_text = match.group(1), match.group(2)
-            base_pos = match.start(2)
-            for num_match in re.finditer(r'\d+', numbers_text):
-                items_to_skip.append({'start': base_pos + num_match.start(), 'end': base_pos + num_match.end(), 'text': num_match.group(0), 'reason': 'legal', 'type': 'legal_number', 'context': term})
+        for match in _UKRAINIAN_DATE_RE.finditer(text):
+            skip_spans.add(match.start(), match.end())
+
+    for pattern in _LEGAL_REFERENCE_RES:
+        for match in pattern.finditer(text):
+            # Числа шукаємо прямо в text у межах групи — позиції вже абсолютні
+            for num_match in _DIGITS_RE.finditer(text, match.start(2), match.end(2)):
+                skip_spans.add(num_match.start(), num_match.end())
 
     if _cfg.MASK_ORDERS or _cfg.MASK_BR_NUMBERS:
-        for match in re.finditer(r'№', text):
+        for match in _NUMBER_SIGN_RE.finditer(text):
             result = analyze_number_sign_context(text, match)
-            if result: items_to_mask.append(result)
+            if result:
+                items_to_mask.append(result)
+                mask_spans.add(result['start'], result['end'])
 
     if _cfg.MASK_BR_NUMBERS:
-        for match in re.finditer(r'\bБР\b', text, re.IGNORECASE):
+        for match in _BR_KEYWORD_RE.finditer(text):
             result = analyze_br_keyword(text, match)
             if result:
-                skip = any(result['start'] < item['end'] and result['end'] > item['start'] for item in items_to_skip)
-                skip = skip or any(result['start'] < item['end'] and result['end'] > item['start'] for item in items_to_mask)
-                if not skip: items_to_mask.append(result)
-
-    for item_type, flag, pattern in [
-        ('ipn', _cfg.MASK_IPN, r'\b\d{10}\b'),
-        ('passport_id', _cfg.MASK_PASSPORT, r'\b\d{9}\b'),
-        ('military_id', _cfg.MASK_MILITARY_ID, r'\b[A-ZА-Я]{2}[\s-]?\d{6}\b'),
-        ('military_unit', _cfg.MASK_UNITS, r'\b[А-ЯA-Z]\d{4}\b')
-    ]:
-        if flag:
-            for match in re.finditer(pattern, text, re.IGNORECASE if item_type == 'military_id' else 0):
-                skip = any(match.start() >= item['start'] and match.end() <= item['end'] for item in items_to_skip)
-                skip = skip or any(match.start() < item['end'] and match.end() > item['start'] for item in items_to_mask)
-                if not skip: items_to_mask.append({'type': item_type, 'full_text': match.group(0), 'number_part': match.group(0), 'start': match.start(), 'end': match.end()})
+                skip = skip_spans.overlaps(result['start'], result['end'])
+                skip = skip or mask_spans.overlaps(result['start'], result['end'])
+                if not skip:
+                    items_to_mask.append(result)
+                    mask_spans.add(result['start'], result['end'])
+
+    enabled = tuple(item_type for item_type, flag in (
+        ('ipn', _cfg.MASK_IPN),
+        ('passport_id', _cfg.MASK_PASSPORT),
+        ('military_id', _cfg.MASK_MILITARY_ID),
+        ('military_unit', _cfg.MASK_UNITS),
+    ) if flag)
+    if enabled:
+        # Один прохід по тексту для всіх увімкнених ідентифікаторів
+        for match in _identifier_scan_re(enabled).finditer(text):
+            skip = skip_spans.contains(match.start(), match.end())
+            skip = skip or mask_spans.overlaps(match.start(), match.end())
+            if not skip:
+                items_to_mask.append({'type': match.lastgroup, 'full_text': match.group(0), 'number_part': match.group(0), 'start': match.start(), 'end': match.end()})
+                mask_spans.add(match.start(), match.end())
 
     if _cfg.MASK_BRIGADES:
         for match in _cfg.COMPILED_PATTERNS["brigade_number"].finditer(text):
-            skip = any(match.start() >= item['start'] and match.end() <= item['end'] for item in items_to_skip)
-            skip = skip or any(match.start() < item['end'] and match.end() > item['start'] for item in items_to_mask)
-            if not skip: items_to_mask.append({'type': 'brigade_number', 'full_text': match.group(0), 'number_part': match.group(1), 'start': match.start(), 'end': match.end()})
+            skip = skip_spans.contains(match.start(), match.end())
+            skip = skip or mask_spans.overlaps(match.start(), match.end())
+            if not skip:
+                items_to_mask.append({'type': 'brigade_number', 'full_text': match.group(0), 'number_part': match.group(1), 'start': match.start(), 'end': match.end()})
+                mask_spans.add(match.start(), match.end())
 
     if _cfg.MASK_DATES:
         for match in _cfg.COMPILED_PATTERNS["date"].finditer(text):
             if is_valid_date(int(match.group(1)), int(match.group(2)), int(match.group(3))):
-                skip = any(match.start() >= item['start'] and match.end() <= item['end'] for item in items_to_skip)
-                skip = skip or any(match.start() < item['end'] and match.end() > item['start'] for item in items_to_mask)
-                if not skip: items_to_mask.append({'type': 'date', 'full_text': match.group(0), 'number_part': match.group(0), 'start': match.start(), 'end': match.end()})
+                skip = skip_spans.contains(match.start(), match.end())
+                skip = skip or mask_spans.overlaps(match.start(), match.end())
+                if not skip:
+                    items_to_mask.append({'type': 'date', 'full_text': match.group(0), 'number_part': match.group(0), 'start': match.start(), 'end': match.end()})
+                    mask_spans.add(match.start(), match.end())
 
         # Text dates: "06" жовтня 2025 року
         if "date_text" not in masking_dict["mappings"]:
             masking_dict["mappings"]["date_text"] = {}
         for match in _cfg.DATE_TEXT_PATTERN.finditer(text):
-            skip = any(match.start() >= item['start'] and match.end() <= item['end'] for item in items_to_skip)
-            skip = skip or any(match.start() < item['end'] and match.end() > item['start'] for item in items_to_mask)
+            skip = skip_spans.contains(match.start(), match.end())
+            skip = skip or mask_spans.overlaps(match.start(), match.end())
             if not skip:
                 items_to_mask.append({'type': 'date_text', 'full_text': match.group(0), 'number_part': match.group(0), 'start': match.start(), 'end': match.end()})
+                mask_spans.add(match.start(), match.end())
 
     # Обхід у порядку документа: instance tracking збігається з порядком
     # входжень (потрібно для unmask), а заміни збираються сегментами —
@@ -375,6 +479,11 @@ def mask_text_context_aware(text: str, masking_dict: Dict, instance_counters: Di
 
     lines = text.split('\n')
     masked_lines = []
+    # Кеші в межах виклику: звання -> маска та множина вже виданих масок
+    # ПІБ (перебудовується лише коли таблиці surname/name виросли)
+    rank_cache = {}
+    already_masked = set()
+    already_masked_sizes = None
     for line in lines:
         if not looks_like_pib_line(line):
             masked_lines.append(line)
@@ -387,13 +496,9 @@ def mask_text_context_aware(text: str, masking_dict: Dict, instance_counters: Di
         while iteration < 10:
             rank, pib, identifier = parse_hybrid_line(current_line_for_parsing)
             if not pib: break
-            if rank and not pib:
-                current_line_for_parsing = current_line_for_parsing.replace(rank, "___SKIP_RANK___", 1)
-                iteration += 1
-                continue
 
             if rank and _cfg.MASK_RANKS:
-                masked_rank_val = mask_rank_preserve_case(rank, masking_dict, instance_counters)
+                masked_rank_val = _mask_rank_cached(rank, rank_cache, masking_dict, instance_counters)
                 final_line = final_line.replace(rank, masked_rank_val, 1)
                 current_line_for_parsing = current_line_for_parsing.replace(rank, "___RANK_MASKED___", 1)
 
@@ -403,31 +508,35 @@ def mask_text_context_aware(text: str, masking_dict: Dict, instance_counters: Di
                     # Не маскуємо повторно те, що вже є маскою (наприклад,
                     # прізвище, замасковане фазою ініціалів) — вкладену маску
                     # unmask не зможе розкрутити за один прохід
-                    already_masked = {
-                        info["masked_as"].lower()
-                        for cat in ("surname", "name")
-                        for info in masking_dict["mappings"].get(cat, {}).values()
-                        if isinstance(info, dict) and "masked_as" in info
-                    }
+                    tables = [masking_dict["mappings"].get(cat, {}) for cat in ("surname", "name")]
+                    sizes = [len(table) for table in tables]
+                    if sizes != already_masked_sizes:
+                        already_masked = {
+                            info["masked_as"].lower()
+                            for table in tables
+                            for info in table.values()
+                            if isinstance(info, dict) and "masked_as" in info
+                        }
+                        already_masked_sizes = sizes
                     if any(p.lower() in already_masked for p in parts[:2]):
                         current_line_for_parsing = current_line_for_parsing.replace(pib, "___PIB_MASKED___", 1)
                         iteration += 1
                         continue
+                    patronymic = parts[2] if len(parts) >= 3 else ""
+                    # Рід за по батькові визначаємо один раз для імені та по батькові
+                    gender = detect_gender_by_patronymic(patronymic) if patronymic else None
                     if is_likely_surname_by_case(parts[1]):
                         name, surname = parts[0], parts[1]
-                        patronymic = parts[2] if len(parts) >= 3 else ""
                         masked_surname = mask_surname(surname, masking_dict, instance_counters)
-                        masked_name = mask_name(name, masking_dict, instance_counters, gender_hint=detect_gender_by_patronymic(patronymic) if patronymic else None, patronymic_hint=patronymic)
+                        masked_name = mask_name(name, masking_dict, instance_counters, gender_hint=gender, patronymic_hint=patronymic)
                         masked_pib_str = f"{masked_name} {masked_surname}"
                     else:
                         surname, name = parts[0], parts[1]
-                        patronymic = parts[2] if len(parts) >= 3 else ""
                         masked_surname = mask_surname(surname, masking_dict, instance_counters)
-                        masked_name = mask_name(name, masking_dict, instance_counters, gender_hint=detect_gender_by_patronymic(patronymic) if patronymic else None, patronymic_hint=patronymic)
+                        masked_name = mask_name(name, masking_dict, instance_counters, gender_hint=gender, patronymic_hint=patronymic)
                         masked_pib_str = f"{masked_surname} {masked_name}"
 
                     if patronymic:
-                        gender = detect_gender_by_patronymic(patronymic) if patronymic else 'male'
                         masked_patronymic = mask_patronymic(patronymic, gender, masking_dict, instance_counters)
                         masked_pib_str += f" {masked_patronymic}"
 
@@ -444,11 +553,32 @@ def mask_text_context_aware(text: str, masking_dict: Dict, instance_counters: Di
 
     return text
 
+def _json_entries(container):
+    return iter(container.items()) if isinstance(container, dict) else enumerate(container)
+
 def mask_json_recursive(data: Any, masking_dict: Dict, instance_counters: Dict) -> Any:
-    if isinstance(data, dict): return {key: mask_json_recursive(value, masking_dict, instance_counters) for key, value in data.items()}
-    elif isinstance(data, list): return [mask_json_recursive(item, masking_dict, instance_counters) for item in data]
-    elif isinstance(data, str): return mask_text_wrapper(data, masking_dict, instance_counters)
-    else: return data
+    # Ітеративний обхід у тому ж порядку, що й рекурсія (instance tracking
+    # іде за порядком входжень), без обмеження глибини recursionlimit.
+    # Контейнери копіюються (вхід не змінюється), листи пишуться в копію
+    if isinstance(data, str): return mask_text_wrapper(data, masking_dict, instance_counters)
+    if not isinstance(data, (dict, list)): return data
+    result = dict(data) if isinstance(data, dict) else list(data)
+    containers = [result]
+    stack = [_json_entries(result)]
+    while stack:
+        container = containers[-1]
+        for key, value in stack[-1]:
+            if isinstance(value, str):
+                container[key] = mask_text_wrapper(value, masking_dict, instance_counters)
+            elif isinstance(value, (dict, list)):
+                child = container[key] = dict(value) if isinstance(value, dict) else list(value)
+                containers.append(child)
+                stack.append(_json_entries(child))
+                break
+        else:
+            containers.pop()
+            stack.pop()
+    return result
 
 def mask_text_wrapper(text: str, masking_dict: Dict, instance_counters: Dict) -> str:
     return mask_text_context_aware(text, masking_dict, instance_counters)
@@ -9,6 +9,7 @@ Extracted from data_masking.py during the package refactoring (v2.5.0).
 
 import hashlib
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict
 
@@ -41,9 +42,9 @@ def get_next_instance(masked_value: str, instance_counters: Dict[str, int]) -> i
     Instance tracking: відстежуємо випадки коли різні оригінали
     маскуються в одне значення (колізії)
     """
-    instance_counters.setdefault(masked_value, 0)
-    instance_counters[masked_value] += 1
-    return instance_counters[masked_value]
+    instance_num = instance_counters.get(masked_value, 0) + 1
+    instance_counters[masked_value] = instance_num
+    return instance_num
 
 def add_to_mapping(masking_dict: Dict, instance_counters: Dict, category: str, original: str, masked: str) -> str:
     """
@@ -62,21 +63,44 @@ def add_to_mapping(masking_dict: Dict, instance_counters: Dict, category: str, o
     Note:
         Статистика оновлюється тільки для УНІКАЛЬНИХ оригіналів
     """
-    if original not in masking_dict["mappings"][category]:
-        masking_dict["mappings"][category][original] = {
+    table = masking_dict["mappings"][category]
+    entry = table.get(original)
+    if entry is None:
+        entry = table[original] = {
             "masked_as": masked,
             "instances": []
         }
         # Статистика оновлюється тільки для унікальних оригіналів
-        masking_dict["statistics"][category] = masking_dict["statistics"].get(category, 0) + 1
+        statistics = masking_dict["statistics"]
+        statistics[category] = statistics.get(category, 0) + 1
     else:
-        masked = masking_dict["mappings"][category][original]["masked_as"]
+        masked = entry["masked_as"]
 
     # Instance tracking: зберігаємо кожне входження
-    instance_num = get_next_instance(masked, instance_counters)
-    masking_dict["mappings"][category][original]["instances"].append(instance_num)
+    entry["instances"].append(get_next_instance(masked, instance_counters))
     return masked
 
+# Чисті функції над токенами: ті самі прізвища, звання та ідентифікатори
+# повторюються в документі багато разів, тож повторний виклик — lookup у кеші
+_CACHE_SIZE = 8192
+
+# Класи регістру рядка для _classify_case
+_CASE_MIXED, _CASE_UPPER, _CASE_TITLE, _CASE_LOWER = 0, 1, 2, 3
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _classify_case(s: str) -> int:
+    """
+    Визначає клас регістру: _CASE_UPPER, _CASE_TITLE (перша велика, решта малі),
+    _CASE_LOWER або _CASE_MIXED. Кожна перевірка виконується лише за потреби.
+    """
+    if s.isupper(): return _CASE_UPPER
+    if s[:1].isupper(): return _CASE_TITLE if s[1:].islower() else _CASE_MIXED
+    return _CASE_LOWER if s.islower() else _CASE_MIXED
+
+# Перетворення маски за класом регістру оригіналу (індекс — _CASE_*);
+# змішаний регістр зводиться до нижнього
+_CASE_DISPATCH = (str.lower, str.upper, str.capitalize, str.lower)
+
 def _apply_original_case(original: str, masked: str) -> str:
     """
     Застосовує регістр оригінального тексту до замаскованого.
@@ -87,26 +111,32 @@ def _apply_original_case(original: str, masked: str) -> str:
     - lower case (весь текст малими)
     """
     if not original or not masked: return masked
-    if original.isupper(): return masked.upper()
-    elif len(original) > 1 and original[0].isupper() and original[1:].islower(): return masked.capitalize()
-    else: return masked.lower()
+    return _CASE_DISPATCH[_classify_case(original)](masked)
 
+# Маркер вже замаскованого токена (___X___); перевірка зрізами по 3 символи
+_SENT = "___"
+
+# Один прохід str.translate замість ланцюжка replace()/re.sub().
+# Пробільні символи — ті самі, що й \s у re (str.isspace)
+_WHITESPACE_CHARS = ''.join(chr(c) for c in range(0x3001) if chr(c).isspace())
+# Нерозривний пробіл, крапка, крапка з комою та лапки → пробіл: значення
+# в лапках («сержант») мають знаходитись під час пошуку
+_NORMALIZE_TABLE = str.maketrans(dict.fromkeys('\xa0.;' + _cfg.QUOTE_CHARS, ' '))
+_IDENTIFIER_STRIP_TABLE = str.maketrans('', '', _WHITESPACE_CHARS + '-.')
+
+@lru_cache(maxsize=_CACHE_SIZE)
 def normalize_string(s: str) -> str:
     if not s: return ""
-    s_str = str(s).lower()
-    s_str = s_str.replace("'", "'").replace('\xa0', ' ').replace(".", " ").replace(";", " ")
-    # Лапки → пробіл, щоб значення в лапках («сержант») знаходились під час пошуку
-    for q in _cfg.QUOTE_CHARS:
-        s_str = s_str.replace(q, ' ')
-    return re.sub(r'\s+', ' ', s_str).strip()
+    return ' '.join(str(s).lower().translate(_NORMALIZE_TABLE).split())
 
+@lru_cache(maxsize=_CACHE_SIZE)
 def normalize_identifier(identifier: str) -> str:
     if not identifier: return ""
-    identifier_str = str(identifier).upper()
-    return re.sub(r'[\s\-.]', '', identifier_str).strip()
+    return str(identifier).upper().translate(_IDENTIFIER_STRIP_TABLE)
 
+@lru_cache(maxsize=16384)
 def is_pib_anchor(word: str) -> bool:
-    if word.startswith("___") and word.endswith("___"): return False
+    if word[:3] == _SENT == word[-3:]: return False
     word = word.strip(_cfg.QUOTE_CHARS).strip(",.!?;:")
     if not word or len(word) <= 2: return False
     # Слова з цифрами/= — не ПІБ (ІПН=3698521592, «138», кодування)
@@ -122,12 +152,40 @@ def get_deterministic_seed(original: str) -> int:
 
     Використовує hashlib для створення унікального, але повторюваного seed'а.
     """
-    algo = _cfg.HASH_ALGORITHM
-    if algo == 'md5': hasher = hashlib.md5()
-    elif algo == 'sha1': hasher = hashlib.sha1()
-    elif algo == 'sha256': hasher = hashlib.sha256()
-    elif algo == 'blake2b': hasher = hashlib.blake2b()
-    elif algo == 'sha512': hasher = hashlib.sha512()
-    else: raise ValueError(f"Unknown hash algorithm: {algo}")
-    hasher.update(original.encode('utf-8'))
-    return int(hasher.hexdigest(), 16) % (2**32)
+    # Алгоритм — "живий" прапорець, тому входить до ключа кешу
+    return _seed_for(original, _cfg.HASH_ALGORITHM)
+
+_HASHERS = {
+    'md5': hashlib.md5,
+    'sha1': hashlib.sha1,
+    'sha256': hashlib.sha256,
+    'blake2b': hashlib.blake2b,
+    'sha512': hashlib.sha512,
+}
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _seed_for(original: str, algo: str) -> int:
+    hasher = _HASHERS.get(algo)
+    if hasher is None: raise ValueError(f"Unknown hash algorithm: {algo}")
+    # int(hexdigest, 16) % 2**32 == останні 4 байти дайджесту (big-endian):
+    # той самий seed без розбору 128-символьного hex-рядка
+    digest = hasher(original.encode('utf-8')).digest()
+    return int.from_bytes(digest[-4:], 'big')
+
+_DIGITS = '0123456789'
+
+def _random_digits(rng, count: int) -> str:
+    """
+    Рядок з count випадкових цифр від rng (модуль random або random.Random).
+
+    Та сама послідовність, що й count викликів rng.randint(0, 9):
+    randint(0, 9) — це getrandbits(4) з відкиданням значень >= 10.
+    """
+    # _DIGITS[r] — кешовані односимвольні рядки CPython, без алокацій;
+    # bytearray + decode('ascii') на 2-10 цифрах не швидший
+    getrandbits = rng.getrandbits
+    digits = []
+    while len(digits) < count:
+        r = getrandbits(4)
+        if r < 10: digits.append(_DIGITS[r])
+    return ''.join(digits)
@@ -9,65 +9,96 @@ Extracted from data_masking.py during the package refactoring (v2.5.0).
 
 import random
 import re
-from typing import Tuple
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 from masking import constants as _cfg
-from masking.helpers import get_deterministic_seed
+from masking.helpers import _SENT, get_deterministic_seed
+
+_DIGIT_RE = re.compile(r'\d')
+# Прийменники, які ніколи не є іменем
+_SHORT_STOPWORDS = frozenset({'по', 'про', 'від', 'до', 'за', 'на', 'у', 'в', 'з', 'із'})
+# Відмінкові закінчення, дописані малими до прізвища великими (ІВАНОВим)
+_DECLENSION_ENDINGS = frozenset({'ом', 'ем', 'єм', 'ім', 'ою', 'єю', 'у', 'ю', 'а', 'я', 'і', 'ї'})
 
 
 def is_likely_surname_by_case(word: str) -> bool:
-    if word.startswith("___") and word.endswith("___"): return False
+    if word[:3] == _SENT == word[-3:]: return False
     word = word.strip(_cfg.QUOTE_CHARS)
     if not word or len(word) < 3: return False
-    letters_only = re.sub(r"[-']", '', word)
-    return letters_only.isupper() and len(letters_only) >= 3
+    # '-' та "'" не мають регістру, тож isupper() по слову = isupper() по літерах;
+    # довжину літер рахуємо без копіювання рядка
+    return word.isupper() and len(word) - word.count('-') - word.count("'") >= 3
 
+# Викликається для кожного токена рядка; ті самі слова повторюються по всьому документу
+@lru_cache(maxsize=16384)
 def looks_like_name(word: str) -> bool:
-    if word.startswith("___") and word.endswith("___"): return False
+    if word[:3] == _SENT == word[-3:]: return False
     clean_word = word.strip(_cfg.QUOTE_CHARS).rstrip(',.!?;:')
     if len(clean_word) < 3: return False
     if '.' in clean_word: return False
     # Дієслова 1-2 особи множини (Повідомляємо, Просимо, Надаєте) —
     # ніколи не імена/прізвища
-    if clean_word.lower().endswith(('ємо', 'имо', 'емо', 'єте', 'ите', 'ете')):
+    clean_lower = clean_word.lower()
+    if clean_lower.endswith(('ємо', 'имо', 'емо', 'єте', 'ите', 'ете')):
         return False
-    if clean_word.lower() in _cfg.EXCLUDE_WORDS_LOWER: return False
-    if re.search(r'\d', clean_word): return False
-    if clean_word.lower() in _cfg.RANKS_LIST_LOWER: return False
-    if clean_word.lower() in ['по', 'про', 'від', 'до', 'за', 'на', 'у', 'в', 'з', 'із']: return False
+    if clean_lower in _cfg.EXCLUDE_WORDS_LOWER: return False
+    if _DIGIT_RE.search(clean_word): return False
+    if clean_lower in _cfg.RANKS_LIST_LOWER: return False
+    if clean_lower in _SHORT_STOPWORDS: return False
 
     if clean_word[0].isupper() and clean_word[1:].islower(): return True
     if clean_word.isupper(): return True
 
-    declension_endings = ['ом', 'ем', 'єм', 'ім', 'ою', 'єю', 'ою', 'у', 'ю', 'а', 'я', 'і', 'ї']
-    for ending in declension_endings:
-        if len(clean_word) > len(ending) + 2:
-            stem = clean_word[:-len(ending)]
-            suffix = clean_word[-len(ending):]
-            if stem.isupper() and suffix.islower() and suffix == ending:
-                return True
+    # ПРІЗВИЩЕм / ПРІЗВИЩЕу: основа великими + відмінкове закінчення малими.
+    # Перевіряємо лише фактичні 1-2 останні літери слова
+    for size in (2, 1):
+        if len(clean_word) > size + 2 and clean_word[-size:] in _DECLENSION_ENDINGS:
+            if clean_word[:-size].isupper(): return True
     return False
 
+# Закінчення по батькові -> рід. Словник закінчень замість каскаду endswith:
+# перевіряємо суфікси від найдовшого до найкоротшого, по одному lookup на довжину
+_PATRONYMIC_ENDINGS = {
+    **dict.fromkeys(('ович', 'євич', 'ійович', 'йович', 'овича', 'євича', 'ійовича', 'йовича',
+                     'овичу', 'євичу', 'ійовичу', 'йовичу', 'овичем', 'євичем', 'ійовичем', 'йовичем'), 'male'),
+    **dict.fromkeys(('івна', 'ївна', 'івни', 'ївни', 'івні', 'ївні', 'івною', 'ївною'), 'female'),
+}
+_PATRONYMIC_ENDING_LENGTHS = sorted({len(e) for e in _PATRONYMIC_ENDINGS}, reverse=True)
+
+# Закінчення імені -> кандидати (мін. довжина імені, відмінок, рід).
+# Кандидат підходить, якщо len(name) > мін. довжини; інакше — наступний.
+# Двобуквені закінчення мають пріоритет над однобуквеними.
+_NAME_ENDINGS = {
+    **dict.fromkeys(('ом', 'ем', 'єм', 'ім', 'їм'), ((0, 'instrumental', 'male'),)),
+    # 'ією' закінчується на 'єю'
+    **dict.fromkeys(('ою', 'єю'), ((0, 'instrumental', 'female'),)),
+    **dict.fromkeys(('у', 'ю'), ((0, 'dative', 'male'),)),
+    **dict.fromkeys(('і', 'ї'), ((3, 'dative', 'female'),)),
+    # Типові жіночі закінчення на -а/-я: не родовий відмінок чоловічого імені
+    **dict.fromkeys(('ія', 'ла', 'на', 'ра', 'та', 'ка', 'га', 'ва', 'ня', 'ся', 'ша'),
+                    ((2, 'nominative', 'female'),)),
+    **dict.fromkeys(('а', 'я'), ((4, 'genitive', 'male'), (2, 'nominative', 'female'))),
+}
+
+
+# Чисті функції від рядка; ті самі імена й по батькові повторюються по документу
+@lru_cache(maxsize=16384)
 def detect_gender_by_patronymic(patronymic: str) -> str:
     if not patronymic: return 'unknown'
     patron_lower = patronymic.lower().strip('.,!?;')
-    male_endings = ['ович', 'євич', 'ійович', 'йович', 'овича', 'євича', 'ійовича', 'йовича', 'овичу', 'євичу', 'ійовичу', 'йовичу', 'овичем', 'євичем', 'ійовичем', 'йовичем']
-    female_endings = ['івна', 'ївна', 'івни', 'ївни', 'івні', 'ївні', 'івною', 'ївною']
-    if any(patron_lower.endswith(e) for e in male_endings): return 'male'
-    if any(patron_lower.endswith(e) for e in female_endings): return 'female'
+    for size in _PATRONYMIC_ENDING_LENGTHS:
+        gender = _PATRONYMIC_ENDINGS.get(patron_lower[-size:])
+        if gender: return gender
     return 'unknown'
 
+@lru_cache(maxsize=16384)
 def detect_name_case_and_gender(name: str) -> Tuple[str, str]:
     if not name: return 'nominative', 'male'
     name_lower = name.lower().strip('.,!?;')
-    if name_lower.endswith(('ом', 'ем', 'єм', 'ім', 'їм')): return 'instrumental', 'male'
-    if name_lower.endswith(('у', 'ю')) and not name_lower.endswith(('ою', 'єю', 'ією')): return 'dative', 'male'
-    if name_lower.endswith(('а', 'я')) and len(name) > 4:
-        common_female_endings = ['ія', 'ла', 'на', 'ра', 'та', 'ка', 'га', 'ва', 'ня', 'ся', 'ша']
-        if not any(name_lower.endswith(e) for e in common_female_endings): return 'genitive', 'male'
-    if name_lower.endswith(('ією', 'ою', 'єю')): return 'instrumental', 'female'
-    if name_lower.endswith(('і', 'ї')) and len(name) > 3: return 'dative', 'female'
-    if name_lower.endswith(('ія', 'а', 'я')) and len(name) > 2: return 'nominative', 'female'
+    candidates = _NAME_ENDINGS.get(name_lower[-2:]) or _NAME_ENDINGS.get(name_lower[-1:], ())
+    for min_len, case, gender in candidates:
+        if len(name) > min_len: return case, gender
     return 'nominative', 'male'
 
 def is_easy_to_decline(name: str, gender: str) -> bool:
@@ -87,61 +118,86 @@ def is_easy_to_decline(name: str, gender: str) -> bool:
         return False
     return False
 
+# Відмінювання імен: рід -> відмінок -> ({закінчення: (скільки літер відрізати, що дописати)},
+# правило за замовчуванням). Закінчення перевіряються від двобуквених до однобуквених.
+# Чоловічі -ій/-й відмінюються однаково: Андрій -> Андрія / Андрію / Андрієм
+_NAME_DECLENSION = {
+    'male': {
+        'genitive': ({'о': (1, 'а'), 'а': (1, 'и'), 'й': (1, 'я')}, (0, 'а')),
+        'dative': ({'о': (1, 'у'), 'а': (1, 'і'), 'й': (1, 'ю')}, (0, 'у')),
+        'instrumental': ({'о': (1, 'ом'), 'а': (1, 'ою'), 'й': (1, 'єм')}, (0, 'ом')),
+    },
+    'female': {
+        'genitive': ({'ія': (2, 'ії'), 'а': (1, 'і'), 'я': (1, 'і')}, (0, 'і')),
+        'dative': ({'ія': (2, 'ії'), 'а': (1, 'і'), 'я': (1, 'і')}, (0, 'і')),
+        'instrumental': ({'ія': (2, 'ією'), 'а': (1, 'ою'), 'я': (1, 'ою')}, (0, 'ою')),
+    },
+}
+
+@lru_cache(maxsize=8192)
 def apply_case_to_name(name: str, case: str, gender: str) -> str:
     if not name: return name
     name = name.strip()
     if case == 'nominative': return name
 
-    if gender == 'male':
-        stem = name
-        if name.endswith('о') or name.endswith('а'): stem = name[:-1]
-        elif name.endswith('ій'): stem = name[:-2] + 'і'
-        elif name.endswith('й'): stem = name[:-1]
-
-        if case == 'genitive':
-            if name.endswith('о') or name.endswith('а'): return stem + ('а' if name.endswith('о') else 'и')
-            if name.endswith('ій') or name.endswith('й'): return stem + 'я'
-            return stem + 'а'
-        elif case == 'dative':
-            if name.endswith('о'): return stem + 'у'
-            if name.endswith('а'): return stem + 'і'
-            if name.endswith('ій') or name.endswith('й'): return stem + 'ю'
-            return stem + 'у'
-        elif case == 'instrumental':
-            if name.endswith('о'): return stem + 'ом'
-            if name.endswith('а'): return stem + 'ою'
-            if name.endswith('ій') or name.endswith('й'): return stem + 'єм'
-            return stem + 'ом'
-
-    elif gender == 'female':
-        stem = name
-        if name.endswith('ія'): stem = name[:-2]
-        elif name.endswith(('а', 'я')): stem = name[:-1]
-
-        if case == 'genitive' or case == 'dative':
-            if name.endswith('ія'): return stem + 'ії'
-            return stem + 'і'
-        elif case == 'instrumental':
-            if name.endswith('ія'): return stem + 'ією'
-            return stem + 'ою'
-
-    return name
+    rules = _NAME_DECLENSION.get(gender, {}).get(case)
+    if rules is None: return name
+    endings, default = rules
+    strip, suffix = endings.get(name[-2:]) or endings.get(name[-1:]) or default
+    return name[:len(name) - strip] + suffix
+
+# Пул імен Faker, розкладений за першою літерою (лише ті, що легко відмінюються).
+# Будується ліниво при першому промаху по whitelist: один вибір з кошика
+# замість до 50 викликів Faker з відкиданням невідповідних літер
+_FAKER_NAME_POOL = None
+_FAKER_POOL_DRAWS = 2000
+
+def _get_faker_name_pool() -> Dict[str, Dict[str, List[str]]]:
+    global _FAKER_NAME_POOL
+    if _FAKER_NAME_POOL is None:
+        # Фіксований seed — вміст пулу не залежить від попередніх викликів Faker
+        _cfg.fake_uk.seed_instance(0)
+        pool = {}
+        for gender, draw in (('male', _cfg.fake_uk.first_name_male),
+                             ('female', _cfg.fake_uk.first_name_female)):
+            buckets = {}
+            for name in {draw() for _ in range(_FAKER_POOL_DRAWS)}:
+                if is_easy_to_decline(name, gender):
+                    buckets.setdefault(name[0].lower(), []).append(name)
+            pool[gender] = {letter: sorted(names) for letter, names in buckets.items()}
+        _FAKER_NAME_POOL = pool
+    return _FAKER_NAME_POOL
+
+@lru_cache(maxsize=None)
+def _whitelist_by_letter(gender: str, first_letter: str) -> Tuple[str, ...]:
+    whitelist = _cfg.GOOD_UKRAINIAN_NAMES_MALE if gender == 'male' else _cfg.GOOD_UKRAINIAN_NAMES_FEMALE
+    return tuple(n for n in whitelist if n[0].lower() == first_letter)
+
+def _easy_name_choice_count(gender: str, first_letter: str) -> int:
+    """
+    Скільки різних імен може повернути generate_easy_name(gender, first_letter, seed)
+    (з max_attempts > 0) за різних seed. 0 — вибір не детермінований (Faker без seed).
+    """
+    available = _whitelist_by_letter(gender, first_letter.lower())
+    if available: return len(available)
+    bucket = _get_faker_name_pool()['female' if gender == 'female' else 'male'].get(first_letter)
+    if bucket: return len(bucket)
+    whitelist = _cfg.GOOD_UKRAINIAN_NAMES_MALE if gender == 'male' else _cfg.GOOD_UKRAINIAN_NAMES_FEMALE
+    return len(whitelist)
 
 def generate_easy_name(gender: str, first_letter: str, seed: int, max_attempts: int = 50) -> str:
-    random.seed(seed)
+    # Локальний генератор: не чіпаємо глобальний стан random (безпечно для потоків)
+    rng = random.Random(seed)
     whitelist = _cfg.GOOD_UKRAINIAN_NAMES_MALE if gender == 'male' else _cfg.GOOD_UKRAINIAN_NAMES_FEMALE
-    available = [n for n in whitelist if n[0].lower() == first_letter.lower()]
+    available = _whitelist_by_letter(gender, first_letter.lower())
     if available:
-        name = random.choice(available).capitalize()
+        name = rng.choice(available).capitalize()
         return name
 
-    last_name = None
-    for attempt in range(max_attempts):
-        if gender == 'female': name = _cfg.fake_uk.first_name_female()
-        else: name = _cfg.fake_uk.first_name_male()
-        last_name = name
-        if name[0].lower() != first_letter: continue
-        if is_easy_to_decline(name, gender): return name
+    if max_attempts > 0:
+        pool = _get_faker_name_pool()['female' if gender == 'female' else 'male']
+        bucket = pool.get(first_letter)
+        if bucket: return rng.choice(bucket)
 
-    if whitelist: return random.choice(whitelist).capitalize()
-    return last_name if last_name else (_cfg.fake_uk.first_name_female() if gender == 'female' else _cfg.fake_uk.first_name_male())
+    if whitelist: return rng.choice(whitelist).capitalize()
+    return _cfg.fake_uk.first_name_female() if gender == 'female' else _cfg.fake_uk.first_name_male()
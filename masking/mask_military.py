@@ -9,13 +9,28 @@ Extracted from data_masking.py during the package refactoring (v2.5.0).
 
 import random
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime
 from typing import Dict, Optional, Tuple
 
 from masking import constants as _cfg
-from masking.helpers import add_to_mapping, get_deterministic_seed, _apply_original_case
+from masking.helpers import add_to_mapping, get_deterministic_seed, _apply_original_case, _random_digits
 from masking.context import extract_base_rank
 
+# Шаблони mask_* компілюються один раз при імпорті, а не на кожен виклик
+_BRIGADE_RE = re.compile(r'(\d+)\s+(.+)')
+_DATE_RE = re.compile(r'(\d{2})\.(\d{2})\.(\d{4})')
+# Суфікси БР номера в порядку пріоритету ("дск" раніше за "к")
+_BR_SUFFIXES = ('дск', 'п', 'к')
+_MIN_DATE_ORDINAL = date(2015, 1, 1).toordinal()
+_MAX_DATE_ORDINAL = date(2035, 12, 31).toordinal()
+
+
+def _mask_digits(text: str, rng: random.Random) -> str:
+    # Кожна цифра (\d) -> випадкова, решта символів без змін; цифри
+    # генеруються одним викликом замість randint у regex-callback на кожну
+    digits = iter(_random_digits(rng, sum(ch.isdecimal() for ch in text)))
+    return ''.join(next(digits) if ch.isdecimal() else ch for ch in text)
+
 
 def mask_military_unit(original: str, masking_dict: Dict, instance_counters: Dict) -> str:
     """
@@ -24,15 +39,16 @@ def mask_military_unit(original: str, masking_dict: Dict, instance_counters: Dic
     Формат: A#### (одна велика літера + 4 цифри)
     Логіка: Зберігає літеру, змінює всі 4 цифри
     """
-    if original in masking_dict["mappings"]["military_unit"]:
-        masked = masking_dict["mappings"]["military_unit"][original]["masked_as"]
+    entry = masking_dict["mappings"]["military_unit"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
-        match = re.match(r'^([А-ЯA-Z])(\d{4})$', original)
-        if not match: return original
-        letter = match.group(1)
+        # Формат фіксований (літера + 4 цифри) — перевіряємо без regex
+        if len(original) != 5 or not original[1:].isdecimal(): return original
+        letter = original[0]
+        if not ('A' <= letter <= 'Z' or 'А' <= letter <= 'Я'): return original
         seed = get_deterministic_seed(original)
-        random.seed(seed)
-        digits = ''.join([str(random.randint(0, 9)) for _ in range(4)])
+        digits = _random_digits(random.Random(seed), 4)
         masked = letter + digits
     return add_to_mapping(masking_dict, instance_counters, "military_unit", original, masked)
 
@@ -42,112 +58,96 @@ def mask_order_number(original: str, masking_dict: Dict, instance_counters: Dict
 
     Логіка: Замінює всі цифри, зберігає формат (№, пробіли, слеші)
     """
-    if original in masking_dict["mappings"]["order_number"]:
-        masked = masking_dict["mappings"]["order_number"][original]["masked_as"]
+    entry = masking_dict["mappings"]["order_number"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
-        seed = get_deterministic_seed(original)
-        random.seed(seed)
-        masked = re.sub(r'\d', lambda _: str(random.randint(0, 9)), original)
+        masked = _mask_digits(original, random.Random(get_deterministic_seed(original)))
     return add_to_mapping(masking_dict, instance_counters, "order_number", original, masked)
 
 def mask_order_number_with_letters(original: str, masking_dict: Dict, instance_counters: Dict) -> str:
-    if original in masking_dict["mappings"]["order_number_with_letters"]:
-        masked = masking_dict["mappings"]["order_number_with_letters"][original]["masked_as"]
+    entry = masking_dict["mappings"]["order_number_with_letters"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
-        seed = get_deterministic_seed(original)
-        random.seed(seed)
-        masked = re.sub(r'\d', lambda _: str(random.randint(0, 9)), original)
+        masked = _mask_digits(original, random.Random(get_deterministic_seed(original)))
     return add_to_mapping(masking_dict, instance_counters, "order_number_with_letters", original, masked)
 
+def _split_br_affixes(original: str) -> Tuple[str, str, str]:
+    """
+    Розбиває БР номер на префікс "№" (з пробілами після нього), номерну
+    частину та суфікс (дск, п, к) — без regex.
+    """
+    suffix = next((s for s in _BR_SUFFIXES if original.endswith(s)), "")
+    prefix = ""
+    number_part = original
+    if original.startswith("№"):
+        number_part = original[1:].lstrip()
+        prefix = original[:len(original) - len(number_part)]
+    if suffix: number_part = number_part[:-len(suffix)]
+    return prefix, number_part, suffix
+
 def mask_br_number(original: str, masking_dict: Dict, instance_counters: Dict) -> str:
     """
     Маскує БР номер.
 
     Логіка: Замінює всі цифри, зберігає структуру (префікси, суфікси, слеші)
     """
-    if original in masking_dict["mappings"]["br_number"]:
-        masked = masking_dict["mappings"]["br_number"][original]["masked_as"]
+    entry = masking_dict["mappings"]["br_number"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
-        seed = get_deterministic_seed(original)
-        random.seed(seed)
+        rng = random.Random(get_deterministic_seed(original))
 
-        # Витягуємо суфікс (дск, п, к)
-        suffix_match = re.search(r'(дск|п|к)$', original)
-        suffix = suffix_match.group(1) if suffix_match else ""
-
-        # Витягуємо префікс (№)
-        prefix = ""
-        number_part = original
-        if original.startswith("№"):
-            match = re.match(r'(№\s*)', original)
-            if match:
-                prefix = match.group(1)
-                number_part = original[len(prefix):]
-        if suffix: number_part = number_part[:-len(suffix)]
-
-        # Обробляємо частини розділені слешами
-        parts = re.split(r'(/)', number_part)
+        prefix, number_part, suffix = _split_br_affixes(original)
+
+        # Обробляємо частини розділені слешами: провідні цифри кожної
+        # частини замінюються, решта частини зберігається
         masked_parts = []
-        for part in parts:
-            if part == '/': masked_parts.append(part)
-            elif part and re.match(r'^\d', part):
-                digit_match = re.match(r'(\d+)(.*)', part)
-                if digit_match:
-                    digits = digit_match.group(1)
-                    rest = digit_match.group(2)
-                    masked_digits = ''.join([str(random.randint(0, 9)) for _ in range(len(digits))])
-                    masked_parts.append(masked_digits + rest)
-                else: masked_parts.append(part)
-            else: masked_parts.append(part)
-        masked = prefix + ''.join(masked_parts) + suffix
+        for part in number_part.split('/'):
+            digits_len = 0
+            while digits_len < len(part) and part[digits_len].isdecimal(): digits_len += 1
+            if digits_len: part = _random_digits(rng, digits_len) + part[digits_len:]
+            masked_parts.append(part)
+        masked = prefix + '/'.join(masked_parts) + suffix
     return add_to_mapping(masking_dict, instance_counters, "br_number", original, masked)
 
 def mask_br_number_slash(original: str, masking_dict: Dict, instance_counters: Dict) -> str:
-    if original in masking_dict["mappings"]["br_number_slash"]:
-        masked = masking_dict["mappings"]["br_number_slash"][original]["masked_as"]
+    entry = masking_dict["mappings"]["br_number_slash"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
-        seed = get_deterministic_seed(original)
-        random.seed(seed)
-        suffix_match = re.search(r'(дск|п|к)$', original)
-        suffix = suffix_match.group(1) if suffix_match else ""
-        prefix = ""
-        number_part = original
-        if original.startswith("№"):
-            match = re.match(r'(№\s*)', original)
-            if match:
-                prefix = match.group(1)
-                number_part = original[len(prefix):]
-        if suffix: number_part = number_part[:-len(suffix)]
+        rng = random.Random(get_deterministic_seed(original))
+        prefix, number_part, suffix = _split_br_affixes(original)
 
         parts = number_part.split('/')
         masked_parts = []
         for part in parts:
             if part.strip().isdigit():
-                masked_parts.append(''.join([str(random.randint(0, 9)) for _ in range(len(part.strip()))]))
+                masked_parts.append(_random_digits(rng, len(part.strip())))
             else:
                 masked_parts.append(part)
         masked = prefix + '/'.join(masked_parts) + suffix
     return add_to_mapping(masking_dict, instance_counters, "br_number_slash", original, masked)
 
 def mask_br_number_complex(original: str, masking_dict: Dict, instance_counters: Dict) -> str:
-    if original in masking_dict["mappings"]["br_number_complex"]:
-        masked = masking_dict["mappings"]["br_number_complex"][original]["masked_as"]
+    entry = masking_dict["mappings"]["br_number_complex"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
-        seed = get_deterministic_seed(original)
-        random.seed(seed)
-        masked = re.sub(r'\d', lambda _: str(random.randint(0, 9)), original)
+        masked = _mask_digits(original, random.Random(get_deterministic_seed(original)))
     return add_to_mapping(masking_dict, instance_counters, "br_number_complex", original, masked)
 
 def mask_brigade_number(original: str, masking_dict: Dict, instance_counters: Dict) -> str:
-    if original in masking_dict["mappings"]["brigade_number"]:
-        masked = masking_dict["mappings"]["brigade_number"][original]["masked_as"]
+    entry = masking_dict["mappings"]["brigade_number"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
-        match = re.match(r'(\d+)\s+(.+)', original)
+        match = _BRIGADE_RE.match(original)
         if not match: return original
         brigade_name = match.group(2)
-        seed = get_deterministic_seed(original)
-        random.seed(seed)
-        masked = f"{random.randint(1, 160)} {brigade_name}"
+        rng = random.Random(get_deterministic_seed(original))
+        masked = f"{rng.randint(1, 160)} {brigade_name}"
     return add_to_mapping(masking_dict, instance_counters, "brigade_number", original, masked)
 
 def is_valid_date(day: int, month: int, year: int) -> bool:
@@ -163,29 +163,29 @@ def mask_date(original: str, masking_dict: Dict, instance_counters: Dict) -> str
 
     Логіка: Зміщує дату на +-30 днів, обмежує роки 2015-2035.
     """
-    if original in masking_dict["mappings"]["date"]:
-        masked = masking_dict["mappings"]["date"][original]["masked_as"]
+    entry = masking_dict["mappings"]["date"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
         try:
-            match = re.match(r'(\d{2})\.(\d{2})\.(\d{4})', original)
+            match = _DATE_RE.match(original)
             if not match: return original
 
             day, month, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
             if not is_valid_date(day, month, year): return original
 
-            # Створюємо об'єкт дати та зміщуємо на +-30 днів
-            date_obj = datetime(year, month, day)
-            seed = get_deterministic_seed(original)
-            random.seed(seed)
-            new_date = date_obj + timedelta(days=random.randint(-30, 30))
+            # Зміщуємо дату на +-30 днів арифметикою над порядковим номером дня
+            rng = random.Random(get_deterministic_seed(original))
+            new_date = date.fromordinal(date(year, month, day).toordinal() + rng.randint(-30, 30))
 
             # Обмежуємо діапазон років 2015-2035
             if new_date.year < 2015:
-                new_date = datetime(2015, 1, 1) + timedelta(days=random.randint(0, 365))
+                new_date = date.fromordinal(_MIN_DATE_ORDINAL + rng.randint(0, 365))
             elif new_date.year > 2035:
-                new_date = datetime(2035, 12, 31) - timedelta(days=random.randint(0, 365))
+                new_date = date.fromordinal(_MAX_DATE_ORDINAL - rng.randint(0, 365))
 
-            masked = new_date.strftime("%d.%m.%Y")
+            # Форматування без strftime (рік завжди чотиризначний)
+            masked = f"{new_date.day:02d}.{new_date.month:02d}.{new_date.year}"
         except (ValueError, OverflowError, TypeError, AttributeError) as e:
             if _cfg.DEBUG_MODE:
                 print(f"Warning: error parsing date '{original}': {e}")
@@ -251,12 +251,34 @@ _mask_date_text = mask_date_text
 # RANK MASKING
 # ============================================================================
 
+def _hierarchy_index(hierarchy):
+    # Звання в нижньому регістрі -> позиція; перше входження, як list.index()
+    index = {}
+    for i, rank in enumerate(hierarchy): index.setdefault(rank.lower(), i)
+    return hierarchy, index
+
+# Категорія -> (ієрархія, індекс): без побудови списку .lower() на кожен виклик
+_RANK_HIERARCHIES = {
+    "army": _hierarchy_index(_cfg.ARMY_RANKS),
+    "naval": _hierarchy_index(_cfg.NAVAL_RANKS),
+    "legal": _hierarchy_index(_cfg.LEGAL_RANKS),
+    "medical": _hierarchy_index(_cfg.MEDICAL_RANKS),
+}
+
+# Усі категорії одним шаблоном: альтернативи-lookahead перевіряються в
+# порядку RANK_PATTERNS, тож перемагає перша категорія з будь-яким збігом
+# (найлівішим для неї) — як і при почерговому search(). Без IGNORECASE:
+# пошук іде по вже зниженому тексту
+_RANK_CATEGORY_RE = re.compile('(?s)^(?:' + '|'.join(
+    f'(?=.*?(?P<{category}>{pattern}))' for category, pattern in _cfg.RANK_PATTERNS.items()) + ')')
+
+def _rank_category_and_match_lower(text_lower: str) -> Tuple[Optional[str], Optional[str]]:
+    match = _RANK_CATEGORY_RE.match(text_lower)
+    if not match: return None, None
+    return match.lastgroup, match.group(match.lastgroup)
+
 def get_rank_category_and_match(text: str) -> Tuple[Optional[str], Optional[str]]:
-    text_lower = text.lower()
-    for category, pattern in _cfg.RANK_PATTERNS.items():
-        match = re.search(pattern, text_lower, re.IGNORECASE)
-        if match: return category, match.group(0)
-    return None, None
+    return _rank_category_and_match_lower(text.lower())
 
 def get_rank_info(rank_form: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     rank_lower = rank_form.lower()
@@ -264,6 +286,16 @@ def get_rank_info(rank_form: str) -> Tuple[Optional[str], Optional[str], Optiona
         return _cfg.RANK_TO_NOMINATIVE[rank_lower]
     return None, None, None
 
+def _rank_mapping_key(original_text: str) -> str:
+    """
+    Ключ mappings["rank"], під яким mask_rank_preserve_case(original_text)
+    обліковує входження: базове звання у називному відмінку, як у mask_rank.
+    """
+    base_rank_text, _ = extract_base_rank(original_text)
+    rank_form = get_rank_info(base_rank_text)[0] or base_rank_text
+    detected_base = get_rank_info(rank_form)[0]
+    return detected_base.lower() if detected_base else rank_form.lower()
+
 def get_rank_in_case(nominative_rank: str, target_case: str) -> str:
     if nominative_rank not in _cfg.RANK_DECLENSIONS: return nominative_rank
     return _cfg.RANK_DECLENSIONS[nominative_rank].get(target_case, nominative_rank)
@@ -282,19 +314,19 @@ def mask_rank(original: str, masking_dict: Dict, instance_counters: Dict) -> str
     detected_base, detected_case, detected_gender = get_rank_info(original_key)
 
     # Use nominative (base) form as the lookup/storage key for consistent mapping
-    lookup_key = detected_base.lower() if detected_base else original_key
-    search_key = detected_base.lower() if detected_base else original_key
+    lookup_key = search_key = detected_base.lower() if detected_base else original_key
 
     # Instance tracking: перевіряємо чи це звання вже не є маскою іншого
-    if lookup_key in masking_dict["mappings"]["rank"]:
+    rank_table = masking_dict["mappings"]["rank"]
+    if lookup_key in rank_table:
         is_someone_else_mask = False
-        for other_original, other_data in masking_dict["mappings"]["rank"].items():
+        for other_original, other_data in rank_table.items():
             if isinstance(other_data, dict) and "masked_as" in other_data:
                 if other_data["masked_as"].lower() == lookup_key and other_original != lookup_key:
                     is_someone_else_mask = True
                     break
         if not is_someone_else_mask:
-            masked = masking_dict["mappings"]["rank"][lookup_key]["masked_as"]
+            masked = rank_table[lookup_key]["masked_as"]
             final_masked = add_to_mapping(masking_dict, instance_counters, "rank", lookup_key, masked)
             # Apply grammatical case if the original was not nominative
             if detected_case and detected_case != "nominative":
@@ -303,29 +335,26 @@ def mask_rank(original: str, masking_dict: Dict, instance_counters: Dict) -> str
             return final_masked
 
     # Визначаємо категорію та ієрархію звань
-    category_name, matched = get_rank_category_and_match(search_key)
+    # search_key уже в нижньому регістрі
+    category_name, matched = _rank_category_and_match_lower(search_key)
     if not matched: return original
 
-    if category_name == "army": hierarchy = _cfg.ARMY_RANKS
-    elif category_name == "naval": hierarchy = _cfg.NAVAL_RANKS
-    elif category_name == "legal": hierarchy = _cfg.LEGAL_RANKS
-    elif category_name == "medical": hierarchy = _cfg.MEDICAL_RANKS
-    else: return original
+    if category_name not in _RANK_HIERARCHIES: return original
+    hierarchy, hierarchy_index = _RANK_HIERARCHIES[category_name]
 
-    try: idx = [r.lower() for r in hierarchy].index(matched.lower())
-    except ValueError: return original
+    idx = hierarchy_index.get(matched)
+    if idx is None: return original
 
     # Генеруємо нове звання зі зсувом позиції
-    seed = get_deterministic_seed(search_key)
-    random.seed(seed)
-    shift = random.choice(_cfg.RANK_SHIFT_OPTIONS)
+    rng = random.Random(get_deterministic_seed(search_key))
+    shift = rng.choice(_cfg.RANK_SHIFT_OPTIONS)
     new_idx = max(0, min(len(hierarchy) - 1, idx + shift))
     masked = hierarchy[new_idx]
 
     # Уникаємо випадків коли звання мапиться саме на себе
     attempts = 0
     while masked.lower() == search_key and attempts < 10:
-        shift = random.choice(_cfg.RANK_SHIFT_OPTIONS)
+        shift = rng.choice(_cfg.RANK_SHIFT_OPTIONS)
         new_idx = max(0, min(len(hierarchy) - 1, idx + shift))
         masked = hierarchy[new_idx]
         attempts += 1
@@ -9,18 +9,43 @@ Extracted from data_masking.py during the package refactoring (v2.5.0).
 
 import random
 import re
+from functools import lru_cache
 from typing import Dict
 
+from faker.providers.person.uk_UA import Provider as _UkPersonProvider
+
 from masking import constants as _cfg
 from masking.helpers import (
     add_to_mapping, get_deterministic_seed, get_next_instance,
-    _apply_original_case, normalize_identifier,
+    _apply_original_case, normalize_identifier, _random_digits,
+    _classify_case, _CASE_UPPER, _CASE_TITLE, _CASE_LOWER,
 )
 from masking.language import (
     detect_gender_by_patronymic, detect_name_case_and_gender,
-    generate_easy_name, apply_case_to_name,
+    generate_easy_name, apply_case_to_name, _easy_name_choice_count,
 )
 
+_MILITARY_ID_RE = re.compile(r'^([A-ZА-Я]{2})?(\d{6})$')
+
+# Той самий seed дає те саме значення — кешуємо вибір за seed
+_FAKER_CACHE_SIZE = 131072
+
+# fake_uk.last_name() / middle_name_*() після seed_instance(seed) — це
+# Random(seed).choice() по кортежу провайдера uk_UA; вибираємо з нього
+# напряму, без reseed усього Faker
+_UK_LAST_NAMES = _UkPersonProvider.last_names
+_UK_MIDDLE_NAMES_MALE = _UkPersonProvider.middle_names_male
+_UK_MIDDLE_NAMES_FEMALE = _UkPersonProvider.middle_names_female
+
+@lru_cache(maxsize=_FAKER_CACHE_SIZE)
+def _fake_last_name(seed: int) -> str:
+    return random.Random(seed).choice(_UK_LAST_NAMES)
+
+@lru_cache(maxsize=_FAKER_CACHE_SIZE)
+def _fake_patronymic(seed: int, gender: str) -> str:
+    pool = _UK_MIDDLE_NAMES_MALE if gender == 'male' else _UK_MIDDLE_NAMES_FEMALE
+    return random.Random(seed).choice(pool)
+
 
 def mask_ipn(original: str, masking_dict: Dict, instance_counters: Dict) -> str:
     """
@@ -29,13 +54,13 @@ def mask_ipn(original: str, masking_dict: Dict, instance_counters: Dict) -> str:
     Формат: 10 цифр
     Логіка: Зберігає перші 3 та останню цифру, змінює середні 6 цифр
     """
-    if original in masking_dict["mappings"]["ipn"]:
-        masked = masking_dict["mappings"]["ipn"][original]["masked_as"]
+    entry = masking_dict["mappings"]["ipn"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
         if len(original) != 10 or not original.isdigit(): return original
         seed = get_deterministic_seed(original)
-        random.seed(seed)
-        middle = ''.join([str(random.randint(0, 9)) for _ in range(6)])
+        middle = _random_digits(random.Random(seed), 6)
         masked = original[:3] + middle + original[-1]
     return add_to_mapping(masking_dict, instance_counters, "ipn", original, masked)
 
@@ -46,13 +71,13 @@ def mask_passport_id(original: str, masking_dict: Dict, instance_counters: Dict)
     Формат: 9 цифр
     Логіка: Зберігає перші 3 та останню цифру, змінює середні 5 цифр
     """
-    if original in masking_dict["mappings"]["passport_id"]:
-        masked = masking_dict["mappings"]["passport_id"][original]["masked_as"]
+    entry = masking_dict["mappings"]["passport_id"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
         if len(original) != 9 or not original.isdigit(): return original
         seed = get_deterministic_seed(original)
-        random.seed(seed)
-        middle = ''.join([str(random.randint(0, 9)) for _ in range(5)])
+        middle = _random_digits(random.Random(seed), 5)
         masked = original[:3] + middle + original[-1]
     return add_to_mapping(masking_dict, instance_counters, "passport_id", original, masked)
 
@@ -65,17 +90,17 @@ def mask_military_id(original: str, masking_dict: Dict, instance_counters: Dict)
     - AA ######  (2 великі літери + пробіл + 6 цифр)
     - AA-######  (2 великі літери + дефіс + 6 цифр)
     """
-    if original in masking_dict["mappings"]["military_id"]:
-        masked = masking_dict["mappings"]["military_id"][original]["masked_as"]
+    entry = masking_dict["mappings"]["military_id"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
         normalized = normalize_identifier(original)
-        prefix_match = re.match(r'^([A-ZА-Я]{2})?(\d{6})$', normalized)
+        prefix_match = _MILITARY_ID_RE.match(normalized)
         if not prefix_match: return original
         prefix = prefix_match.group(1) or ""
         digits = prefix_match.group(2)
         seed = get_deterministic_seed(original)
-        random.seed(seed)
-        middle = ''.join([str(random.randint(0, 9)) for _ in range(2)])
+        middle = _random_digits(random.Random(seed), 2)
         masked_digits = digits[:2] + middle + digits[-2:]
         if " " in original: masked = f"{prefix} {masked_digits}" if prefix else masked_digits
         elif "-" in original: masked = f"{prefix}-{masked_digits}" if prefix else masked_digits
@@ -94,15 +119,14 @@ def mask_surname(original: str, masking_dict: Dict, instance_counters: Dict) ->
     - Абревіатури з ABBREVIATION_WHITELIST НЕ маскуються (ЗСУ, МОУ, СБУ тощо)
     """
     if original.lower() in _cfg.ABBREVIATION_WHITELIST: return original
-    if original in masking_dict["mappings"]["surname"]:
-        masked = masking_dict["mappings"]["surname"][original]["masked_as"]
+    entry = masking_dict["mappings"]["surname"].get(original)
+    if entry is not None:
+        masked = entry["masked_as"]
     else:
-        is_upper = original.isupper()
-        is_capitalize = original[0].isupper() and original[1:].islower()
+        case_class = _classify_case(original)
         seed = get_deterministic_seed(original)
         random.seed(seed)
-        _cfg.fake_uk.seed_instance(seed)
-        fake_surname = _cfg.fake_uk.last_name()
+        fake_surname = _fake_last_name(seed)
 
         # Для коротких прізвищ генеруємо нове повністю
         if len(original) < 5:
@@ -117,8 +141,8 @@ def mask_surname(original: str, masking_dict: Dict, instance_counters: Dict) ->
             masked = original[:3] + middle + original[-5:]
 
         # Застосовуємо регістр
-        if is_upper: masked = masked.upper()
-        elif is_capitalize: masked = masked.capitalize()
+        if case_class == _CASE_UPPER: masked = masked.upper()
+        elif case_class == _CASE_TITLE: masked = masked.capitalize()
     return add_to_mapping(masking_dict, instance_counters, "surname", original, masked)
 
 def mask_patronymic(patronymic: str, gender: str, masking_dict: Dict, instance_counters: Dict) -> str:
@@ -126,27 +150,24 @@ def mask_patronymic(patronymic: str, gender: str, masking_dict: Dict, instance_c
     Маскує по батькові з урахуванням роду.
     """
     if not _cfg.MASK_NAMES or not patronymic: return patronymic
-    is_upper = patronymic.isupper()
-    is_capitalize = patronymic[0].isupper() and patronymic[1:].islower() if len(patronymic) > 1 else False
     patronymic_lower = patronymic.lower()
 
-    if "patronymic" not in masking_dict["mappings"]: masking_dict["mappings"]["patronymic"] = {}
-    if patronymic_lower in masking_dict["mappings"]["patronymic"]:
-        masked = masking_dict["mappings"]["patronymic"][patronymic_lower]["masked_as"]
+    table = masking_dict["mappings"].setdefault("patronymic", {})
+    entry = table.get(patronymic_lower)
+    if entry is not None:
+        masked = entry["masked_as"]
         masked_with_case = _apply_original_case(patronymic, masked)
         instance_num = get_next_instance(masked, instance_counters)
-        masking_dict["mappings"]["patronymic"][patronymic_lower]["instances"].append(instance_num)
+        entry["instances"].append(instance_num)
         return masked_with_case
 
     # Генеруємо нове по батькові відповідного роду
-    seed = get_deterministic_seed(patronymic_lower)
-    random.seed(seed)
-    _cfg.fake_uk.seed_instance(seed)
-    fake_patronymic = _cfg.fake_uk.middle_name_male() if gender == 'male' else _cfg.fake_uk.middle_name_female()
+    fake_patronymic = _fake_patronymic(get_deterministic_seed(patronymic_lower), gender)
 
     # Застосовуємо регістр
-    if is_upper: fake_patronymic = fake_patronymic.upper()
-    elif is_capitalize: fake_patronymic = fake_patronymic.capitalize()
+    case_class = _classify_case(patronymic)
+    if case_class == _CASE_UPPER: fake_patronymic = fake_patronymic.upper()
+    elif case_class == _CASE_TITLE: fake_patronymic = fake_patronymic.capitalize()
     else: fake_patronymic = fake_patronymic.lower()
 
     return add_to_mapping(masking_dict, instance_counters, "patronymic", patronymic_lower, fake_patronymic)
@@ -156,13 +177,12 @@ def mask_name(original: str, masking_dict: Dict, instance_counters: Dict, gender
     Маскує ім'я з автоматичним визначенням роду та відмінка.
     """
     # БАГ #17 FIX: Зберігаємо оригінальний регістр перед обробкою
-    is_upper = original.isupper()
-    is_capitalize = original[0].isupper() and (len(original) == 1 or original[1:].islower())
-    is_lower = original.islower()
+    case_class = _classify_case(original)
 
-    if original in masking_dict["mappings"]["name"]:
+    entry = masking_dict["mappings"]["name"].get(original)
+    if entry is not None:
         # Ім'я вже маскувалось раніше - беремо існуючу маску
-        masked = masking_dict["mappings"]["name"][original]["masked_as"]
+        masked = entry["masked_as"]
     else:
         # Перше маскування - генеруємо нову маску
         if not original: return original
@@ -184,20 +204,25 @@ def mask_name(original: str, masking_dict: Dict, instance_counters: Dict, gender
         new_name = generate_easy_name(gender, first_letter, seed, max_attempts=50)
         masked = apply_case_to_name(new_name, case, gender)
 
-        # Уникаємо випадків коли ім'я мапиться саме на себе
+        # Уникаємо випадків коли ім'я мапиться саме на себе.
+        # Seed спроби лишається хешем original + номер: інше змішування
+        # змінило б уже видані маски; сам хеш закешований get_deterministic_seed
+        # Якщо на цю літеру є лише одне ім'я, повторні спроби дадуть те саме
+        original_lower = original.lower()
+        max_retries = 0 if _easy_name_choice_count(gender, first_letter) == 1 else 10
         attempts = 0
-        while masked.lower() == original.lower() and attempts < 10:
+        while masked.lower() == original_lower and attempts < max_retries:
             seed = get_deterministic_seed(original + str(attempts))
             new_name = generate_easy_name(gender, first_letter, seed, max_attempts=50)
             masked = apply_case_to_name(new_name, case, gender)
             attempts += 1
 
     # БАГ #17 FIX: Застосовуємо регістр до masked ПЕРЕД add_to_mapping
-    if is_upper:
+    if case_class == _CASE_UPPER:
         masked = masked.upper()
-    elif is_capitalize:
+    elif case_class == _CASE_TITLE:
         masked = masked.capitalize()
-    elif is_lower:
+    elif case_class == _CASE_LOWER:
         masked = masked.lower()
 
     return add_to_mapping(masking_dict, instance_counters, "name", original, masked)
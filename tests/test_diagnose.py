@@ -10,6 +10,7 @@ Version: 2.6.0
 License: BSD 3-Clause "New" or "Revised" License
 Year: 2025-2026
 """
+import os
 import pytest
 from pathlib import Path
 import sys
@@ -17,7 +18,9 @@ import sys
 # Додаємо батьківську директорію, щоб імпортувати diagnose_mapping
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from diagnose_mapping import verify_text_recovery, analyze_category_structure
+from diagnose_mapping import (
+    verify_text_recovery, analyze_category_structure, find_original_and_recovery
+)
 
 
 # ============================================================================
@@ -425,4 +428,114 @@ def test_verify_multiple_ranks_document(tmp_path, capsys):
 
     captured = capsys.readouterr()
     # Level 2 має пройти
-    assert "✅ [LEVEL 2]" in captured.out
\ No newline at end of file
+    assert "✅ [LEVEL 2]" in captured.out
+
+def test_verify_line_count_ignores_form_feed(tmp_path, capsys):
+    """
+    Тест підрахунку рядків: рядки діляться лише по '\\n', як у readlines().
+
+    Сценарій: Оригінал містить розрив сторінки (\\f) всередині рядка.
+    """
+    orig = tmp_path / "input.txt"
+    rec = tmp_path / "rec.txt"
+
+    orig.write_text("Сторінка 1\fСторінка 2\nкінець", encoding="utf-8")
+    rec.write_text("Сторінка 1\fСторінка 2 кінець", encoding="utf-8")
+
+    verify_text_recovery(orig, rec)
+
+    captured = capsys.readouterr()
+    assert "✅ [LEVEL 2]" in captured.out
+    assert "В оригіналі: 2 рядків" in captured.out
+    assert "Відновлено:  1 рядків" in captured.out
+
+
+def test_verify_first_mismatch_position_long_text(tmp_path, capsys):
+    """
+    Тест діагностики Level 2: позиція першої розбіжності у довгому тексті
+    (розбіжність далеко за межами першого блоку порівняння).
+    """
+    orig = tmp_path / "input.txt"
+    rec = tmp_path / "rec.txt"
+
+    prefix = "слово " * 2000  # 12000 символів
+    orig.write_text(prefix + "Іванов кінець", encoding="utf-8")
+    rec.write_text(prefix + "Петров кінець", encoding="utf-8")
+
+    verify_text_recovery(orig, rec)
+
+    captured = capsys.readouterr()
+    assert "❌ [LEVEL 2]" in captured.out
+    assert "на позиції 12000:" in captured.out
+
+def test_verify_diff_input_capped_after_common_prefix(tmp_path, capsys):
+    """
+    Тест обмеження входу difflib: спільний початок не обрізається,
+    тому розбіжність після довгого однакового фрагмента все одно видно.
+    """
+    orig = tmp_path / "input.txt"
+    rec = tmp_path / "rec.txt"
+
+    same = [f"Line {i}" for i in range(500)]
+    orig.write_text("\n".join(same + [f"Old {i}" for i in range(500)]), encoding="utf-8")
+    rec.write_text("\n".join(same + [f"New {i}" for i in range(500)]), encoding="utf-8")
+
+    verify_text_recovery(orig, rec)
+
+    captured = capsys.readouterr()
+    assert "diff побудовано лише для перших" in captured.out
+    assert "-Old 0" in captured.out
+    assert "приховано" in captured.out
+
+def test_verify_same_size_difference_in_last_chunk(tmp_path, capsys):
+    """
+    Тест Level 1 для великих файлів однакового розміру:
+    розбіжність в останньому блоці побайтового порівняння.
+    """
+    orig = tmp_path / "input.txt"
+    rec = tmp_path / "rec.txt"
+
+    body = "майор Іванов І.І.\n" * 10000
+    orig.write_text(body + "A", encoding="utf-8")
+    rec.write_text(body + "B", encoding="utf-8")
+
+    verify_text_recovery(orig, rec)
+    assert "❌ [LEVEL 1]" in capsys.readouterr().out
+
+    rec.write_text(body + "A", encoding="utf-8")
+    verify_text_recovery(orig, rec)
+    assert "✅ [LEVEL 1]" in capsys.readouterr().out
+
+# ============================================================================
+# ТЕСТИ ДЛЯ ПОШУКУ ФАЙЛІВ
+# ============================================================================
+
+def test_find_latest_recovery_across_dirs(tmp_path, monkeypatch):
+    """
+    Тест пошуку пари файлів: обирається найсвіжіший input_recovery_*.txt
+    серед усіх директорій пошуку, інші файли ігноруються.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "output").mkdir()
+    (tmp_path / "input.txt").write_text("x", encoding="utf-8")
+
+    older = tmp_path / "input_recovery_1.txt"
+    newer = tmp_path / "output" / "input_recovery_2.txt"
+    other = tmp_path / "output" / "masking_map_3.txt"
+    for i, f in enumerate((older, newer, other)):
+        f.write_text("x", encoding="utf-8")
+        os.utime(f, (1_000_000 + i, 1_000_000 + i))
+
+    original, recovery = find_original_and_recovery()
+
+    assert original == Path("input.txt")
+    assert recovery == Path("output/input_recovery_2.txt")
+
+
+def test_find_recovery_missing(tmp_path, monkeypatch):
+    """
+    Тест пошуку пари файлів: без файлів повертаються None.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    assert find_original_and_recovery() == (None, None)
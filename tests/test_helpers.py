@@ -11,7 +11,7 @@ Year: 2025-2026
 
 """
 import pytest
-from data_masking import _apply_original_case
+from data_masking import _apply_original_case, get_deterministic_seed
 
 
 class TestApplyOriginalCase:
@@ -68,8 +68,73 @@ class TestApplyOriginalCase:
         ("тест", "результат", "результат"),
         ("COLONEL", "major", "MAJOR"),
         ("Colonel", "major", "Major"),
+        ("КаПіТаН", "майор", "майор"),
+        ("ПЕтров", "Іванов", "іванов"),
+        ("ТЦК-1", "центр", "ЦЕНТР"),
     ])
     def test_various_cases(self, original, masked, expected):
         """Parametrized test for various cases"""
         result = _apply_original_case(original, masked)
         assert result == expected
+
+
+class TestDeterministicSeed:
+    """Tests for get_deterministic_seed() helper function"""
+
+    def test_repeatable(self):
+        assert get_deterministic_seed("Петренко") == get_deterministic_seed("Петренко")
+
+    def test_follows_hash_algorithm(self, monkeypatch):
+        """Cached seeds must not leak across HASH_ALGORITHM changes"""
+        from masking import constants
+        blake = get_deterministic_seed("Петренко")
+        monkeypatch.setattr(constants, "HASH_ALGORITHM", "sha256")
+        sha = get_deterministic_seed("Петренко")
+        assert sha != blake
+        monkeypatch.setattr(constants, "HASH_ALGORITHM", "blake2b")
+        assert get_deterministic_seed("Петренко") == blake
+
+    def test_unknown_algorithm(self, monkeypatch):
+        from masking import constants
+        monkeypatch.setattr(constants, "HASH_ALGORITHM", "crc32")
+        with pytest.raises(ValueError):
+            get_deterministic_seed("Петренко")
+
+
+class TestRandomDigits:
+    """Tests for _random_digits() helper function"""
+
+    @pytest.mark.parametrize("seed", [0, 1, 42, 2**31 - 1])
+    def test_matches_randint_sequence(self, seed):
+        """Masks must stay identical to the historical randint(0, 9) digits"""
+        import random
+        from masking.helpers import _random_digits
+        rng = random.Random(seed)
+        expected = ''.join(str(rng.randint(0, 9)) for _ in range(12))
+        assert _random_digits(random.Random(seed), 12) == expected
+
+    def test_zero_count(self):
+        import random
+        from masking.helpers import _random_digits
+        assert _random_digits(random.Random(0), 0) == ""
+
+
+class TestClassifyCase:
+    """Tests for _classify_case() helper function"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("ІВАНОВ", "upper"),
+        ("А", "upper"),
+        ("Іванов", "title"),
+        ("іванов", "lower"),
+        ("ІваНов", "mixed"),
+        ("Штаб-Сержант", "mixed"),
+        ("", "mixed"),
+    ])
+    def test_case_classes(self, text, expected):
+        from masking import helpers
+        classes = {
+            "upper": helpers._CASE_UPPER, "title": helpers._CASE_TITLE,
+            "lower": helpers._CASE_LOWER, "mixed": helpers._CASE_MIXED,
+        }
+        assert helpers._classify_case(text) == classes[expected]
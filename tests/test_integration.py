@@ -1000,5 +1000,150 @@ class TestChainRoundtrip:
         assert "Коваленко" in restored, f"Surname not restored from loaded chain. Got: {restored}"
         assert "9876543210" in restored, f"IPN not restored from loaded chain. Got: {restored}"
 
+class TestSpanIndex:
+    """Тести індексу інтервалів для перевірок перетину при скануванні."""
+
+    def test_matches_linear_scan(self):
+        """overlaps/contains збігаються з повним перебором списку"""
+        import random
+        from masking.engine import _SpanIndex
+        rng = random.Random(7)
+        index, spans = _SpanIndex(), []
+        for _ in range(200):
+            start = rng.randrange(300)
+            end = start + rng.randrange(1, 25)
+            index.add(start, end)
+            spans.append((start, end))
+            qs = rng.randrange(300)
+            qe = qs + rng.randrange(1, 25)
+            assert index.overlaps(qs, qe) == any(s < qe and e > qs for s, e in spans)
+            assert index.contains(qs, qe) == any(s <= qs and e >= qe for s, e in spans)
+
+    def test_adjacent_spans_do_not_overlap(self):
+        """Суміжні інтервали [0,5) і [5,9) не перетинаються"""
+        from masking.engine import _SpanIndex
+        index = _SpanIndex()
+        index.add(0, 5)
+        assert not index.overlaps(5, 9)
+        assert index.overlaps(4, 9)
+        assert index.contains(1, 5)
+        assert not index.contains(1, 6)
+
+
+class TestRepeatedRanks:
+    """Повторні звання в одному тексті (кеш mask_rank_preserve_case у межах виклику)."""
+
+    def test_each_occurrence_is_tracked(self):
+        """Кожне входження звання дописує instance, як і без кешу"""
+        from masking.engine import mask_text_context_aware
+        from masking.mask_military import mask_rank_preserve_case
+        lines = ["солдат Петренко Іван Іванович", "солдат Коваленко Петро Петрович",
+                 "СОЛДАТ Шевченко Олег Олегович", "солдат Петренко Іван Іванович"]
+        categories = ["surname", "name", "patronymic", "rank"]
+
+        masking_dict = {"mappings": {k: {} for k in categories}, "statistics": {}}
+        counters = {}
+        masked = mask_text_context_aware("\n".join(lines), masking_dict, counters)
+
+        expected_dict = {"mappings": {k: {} for k in categories}, "statistics": {}}
+        expected_counters = {}
+        expected = [mask_text_context_aware(line, expected_dict, expected_counters) for line in lines]
+
+        assert masked.split("\n") == expected
+        assert masking_dict == expected_dict
+        assert counters == expected_counters
+        assert len(masking_dict["mappings"]["rank"]["солдат"]["instances"]) == 4
+        assert mask_rank_preserve_case("солдат", masking_dict, counters) == masked.split()[0]
+
+
+class TestMappingJsonWriter:
+    """Запис mapping файлу через orjson або json."""
+
+    MAPPING = {
+        "version": "2.6.0",
+        "statistics": {"surname": 1},
+        "mappings": {"surname": {"Петренко": {"masked_as": "Коваленко", "instances": [1]}},
+                     "rank": {}},
+        "instance_tracking": {"Коваленко": 1},
+    }
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_same_bytes_as_json_dump(self, temp_dir, monkeypatch, use_orjson):
+        """Обидва шляхи пишуть ті самі байти, що й json.dump(indent=2)"""
+        import json
+        from masking import cli
+        if use_orjson:
+            pytest.importorskip("orjson")
+        monkeypatch.setattr(cli, "ORJSON_AVAILABLE", use_orjson)
+        map_path = temp_dir / "map.json"
+        cli._write_mapping_json(map_path, self.MAPPING)
+        expected = json.dumps(self.MAPPING, ensure_ascii=False, indent=2).encode("utf-8")
+        assert map_path.read_bytes() == expected
+
+
+class TestMaskJsonRecursive:
+    """Ітеративний обхід JSON у mask_json_recursive."""
+
+    @staticmethod
+    def _masking_dict():
+        return {"mappings": {k: {} for k in ["ipn", "surname", "name", "rank", "patronymic"]},
+                "statistics": {}}
+
+    def test_deep_nesting_beyond_recursion_limit(self):
+        """Глибина вкладеності не обмежена sys.getrecursionlimit()"""
+        from masking.engine import mask_json_recursive
+        depth = sys.getrecursionlimit() + 100
+        data = "ІПН 1234567890"
+        for _ in range(depth):
+            data = {"x": [data]}
+        masked = mask_json_recursive(data, self._masking_dict(), {})
+        for _ in range(depth):
+            masked = masked["x"][0]
+        assert "1234567890" not in masked
+
+    def test_input_is_not_modified(self):
+        """Результат — нові контейнери, вхідні дані без змін"""
+        from masking.engine import mask_json_recursive
+        data = {"a": ["ІПН 1234567890", {"b": "ІПН 1234567890"}], "n": 5, "z": None}
+        masked = mask_json_recursive(data, self._masking_dict(), {})
+        assert data == {"a": ["ІПН 1234567890", {"b": "ІПН 1234567890"}], "n": 5, "z": None}
+        assert masked["n"] == 5 and masked["z"] is None
+        assert masked["a"][0] == masked["a"][1]["b"] != data["a"][0]
+
+
+class TestPathologicalInput:
+    """Довгі пробільні проміжки та серії літер обробляються за лінійний час."""
+
+    @pytest.mark.parametrize("text", [
+        "солдат" + " " * 20000 + "Іванов",
+        "1" + " " * 20000 + "січ",
+        "А" * 20000,
+        "АБ" + " " * 20000 + "-" + " " * 20000 + "1",
+    ])
+    def test_masking_finishes_quickly(self, text):
+        """Кожен з рядків раніше оброблявся секунди-хвилини (квадратичний backtracking)"""
+        import time
+        from masking.engine import mask_text_context_aware
+        masking_dict = {"mappings": {k: {} for k in ["ipn", "surname", "name", "rank", "patronymic"]},
+                        "statistics": {}}
+        started = time.perf_counter()
+        mask_text_context_aware(text, masking_dict, {})
+        assert time.perf_counter() - started < 2.0
+
+
+class TestBrKeywordPattern:
+    """Шаблон пошуку слова БР у mask_text_context_aware."""
+
+    @pytest.mark.parametrize("text", [
+        "БР-123", "бр 45/6дск", "Бр", "вБР 1", "БРИГАДА", "ХБР", "(БР)", "№БР-1", "БР_1", "1БР",
+    ])
+    def test_matches_word_boundary_pattern(self, text):
+        """Збіги ті самі, що й у \\bБР\\b з IGNORECASE"""
+        import re
+        from masking.engine import _BR_KEYWORD_RE
+        expected = [m.span() for m in re.finditer(r'\bБР\b', text, re.IGNORECASE)]
+        assert [m.span() for m in _BR_KEYWORD_RE.finditer(text)] == expected
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -4,7 +4,7 @@ Unit tests for untested masking functions in data_masking.py
 
 Tests cover: mask_ipn, mask_passport_id, mask_military_id, mask_military_unit,
 mask_order_number, mask_br_number, mask_brigade_number, mask_date,
-normalize_broken_ranks, detect_gender_by_patronymic
+normalize_broken_ranks, detect_gender_by_patronymic, detect_name_case_and_gender
 """
 import pytest
 import re
@@ -20,6 +20,7 @@ from data_masking import (
     mask_date,
     normalize_broken_ranks,
     detect_gender_by_patronymic,
+    detect_name_case_and_gender,
 )
 
 
@@ -439,3 +440,60 @@ class TestDetectGender:
     def test_with_trailing_punctuation(self):
         assert detect_gender_by_patronymic("Миколайович.") == "male"
         assert detect_gender_by_patronymic("Іванівна,") == "female"
+
+
+# ============================================================================
+# detect_name_case_and_gender
+# ============================================================================
+
+class TestDetectNameCase:
+    """Tests for detect_name_case_and_gender() — case and gender from name ending."""
+
+    @pytest.mark.parametrize("name,expected", [
+        ("Петро", ("nominative", "male")),
+        ("Петром", ("instrumental", "male")),
+        ("Петру", ("dative", "male")),
+        ("Андрію", ("dative", "male")),
+        ("Василя", ("genitive", "male")),
+        ("Олена", ("nominative", "female")),
+        ("Марія", ("nominative", "female")),
+        ("Оленою", ("instrumental", "female")),
+        ("Марією", ("instrumental", "female")),
+        ("Олені", ("dative", "female")),
+        ("Іва", ("nominative", "female")),
+        ("Ві", ("nominative", "male")),
+    ])
+    def test_case_and_gender(self, name, expected):
+        assert detect_name_case_and_gender(name) == expected
+
+    def test_empty_returns_default(self):
+        assert detect_name_case_and_gender("") == ("nominative", "male")
+
+    def test_with_trailing_punctuation(self):
+        assert detect_name_case_and_gender("Петром,") == ("instrumental", "male")
+
+
+# ============================================================================
+# Faker pools
+# ============================================================================
+
+class TestFakerPools:
+    """Direct pool sampling must reproduce seeded Faker output (mask stability)."""
+
+    def test_last_name_matches_seeded_faker(self):
+        from faker import Faker
+        from masking.mask_personal import _fake_last_name
+        fake = Faker('uk_UA')
+        for seed in range(200):
+            fake.seed_instance(seed)
+            assert _fake_last_name(seed) == fake.last_name()
+
+    @pytest.mark.parametrize("gender", ["male", "female"])
+    def test_patronymic_matches_seeded_faker(self, gender):
+        from faker import Faker
+        from masking.mask_personal import _fake_patronymic
+        fake = Faker('uk_UA')
+        draw = fake.middle_name_male if gender == 'male' else fake.middle_name_female
+        for seed in range(200):
+            fake.seed_instance(seed)
+            assert _fake_patronymic(seed, gender) == draw()
@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
 """
-Tests for parsing and analysis functions: looks_like_pib_line, parse_hybrid_line.
+Tests for parsing and analysis functions: looks_like_pib_line, parse_hybrid_line,
+extract_identifier_from_line, clean_line_before_parsing.
 """
 import pytest
 
-from data_masking import looks_like_pib_line, parse_hybrid_line
+from data_masking import (
+    looks_like_pib_line, parse_hybrid_line, extract_identifier_from_line,
+    clean_line_before_parsing,
+)
 
 
 class TestLooksLikePibLine:
@@ -90,3 +94,42 @@ class TestParseHybridLine:
     def test_no_pib_line(self):
         rank, pib, identifier = parse_hybrid_line("звичайний текст без імен")
         assert pib is None
+
+    def test_longest_rank_form_wins(self):
+        # "сержант" всередині "старший сержант" не повинен перемогти довшу форму
+        rank, pib, identifier = parse_hybrid_line(
+            "старший сержант медичної служби у запасі Петренко Андрій Сергійович"
+        )
+        assert rank == "старший сержант медичної служби у запасі"
+        assert pib == "Петренко Андрій Сергійович"
+
+
+class TestExtractIdentifierFromLine:
+    """Tests for extract_identifier_from_line() — trailing identifier token."""
+
+    @pytest.mark.parametrize("line,expected", [
+        ("Іванов Петро 1234567890", "1234567890"),
+        ("Іванов Петро АА123456", "АА123456"),
+        ("Іванов Петро AB12-3_x", "AB123_X"),
+        ("Іванов Петро AB-123", None),
+        ("Іванов Петро ґ123", None),
+        ("Іванов Петро 12.3", None),
+        ("Іванов Петро Миколайович", None),
+        ("", None),
+    ])
+    def test_identifier_shape(self, line, expected):
+        assert extract_identifier_from_line(line) == expected
+
+
+class TestCleanLineBeforeParsing:
+    """Tests for clean_line_before_parsing() — numbering/date noise and whitespace."""
+
+    @pytest.mark.parametrize("line,expected", [
+        ("  20.1.2.1.  солдат  Іванов ", "солдат Іванов"),
+        ("сержант\tПетренко\u00a0Іван", "сержант Петренко Іван"),
+        ("від 01.02.2024 року солдат Іванов", "від солдат Іванов"),
+        ("1! солдат Іванов", "1! солдат Іванов"),
+        ("", ""),
+    ])
+    def test_cleaning(self, line, expected):
+        assert clean_line_before_parsing(line) == expected
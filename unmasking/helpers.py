@@ -22,6 +22,13 @@ from rank_data import (
 # Maximum input file size in bytes (default: 100 MB)
 MAX_INPUT_FILE_SIZE = 100 * 1024 * 1024
 
+# Уточнення до звання для extract_base_rank(): вид служби та статус
+_SERVICE_TYPE_RE = re.compile(r'медичної служби|юстиції', re.IGNORECASE)
+_RANK_STATUS_RE = re.compile(
+    r'у відставці|в запасі|у запасі|на пенсії|в резерві|у резерві',
+    re.IGNORECASE
+)
+
 # Директорії для автоматичного пошуку пар файлів (output + mapping)
 SEARCH_DIRECTORIES = [
     Path('.'),          # Поточна директорія
@@ -217,34 +224,21 @@ def extract_base_rank(full_rank_text: str) -> tuple:
     if not full_rank_text:
         return full_rank_text, ""
 
-    service_type_phrases = ['медичної служби', 'юстиції']
-    status_phrases = [
-        'у відставці', 'в запасі', 'у запасі',
-        'на пенсії', 'в резерві', 'у резерві'
-    ]
-
-    full_rank_lower = full_rank_text.lower()
     base_rank = full_rank_text
     additional_parts = []
 
-    for phrase in service_type_phrases:
-        if phrase in full_rank_lower:
-            phrase_index = full_rank_lower.find(phrase)
-            base_rank = full_rank_text[:phrase_index].strip()
-            additional_parts.append(full_rank_text[phrase_index:phrase_index + len(phrase)])
-            remaining_text = full_rank_text[phrase_index + len(phrase):].strip()
-            full_rank_lower = remaining_text.lower()
-            full_rank_text = remaining_text
-            break
-
-    for phrase in status_phrases:
-        if phrase in full_rank_lower:
-            if not additional_parts:
-                phrase_index = full_rank_text.lower().find(phrase)
-                base_rank = full_rank_text[:phrase_index].strip()
-            phrase_start = full_rank_text.lower().find(phrase)
-            additional_parts.append(full_rank_text[phrase_start:phrase_start + len(phrase)])
-            break
+    # Один регістронезалежний пошук на кожну групу; зрізи беремо з оригіналу
+    service_match = _SERVICE_TYPE_RE.search(full_rank_text)
+    if service_match:
+        base_rank = full_rank_text[:service_match.start()].strip()
+        additional_parts.append(service_match.group(0))
+        full_rank_text = full_rank_text[service_match.end():].strip()
+
+    status_match = _RANK_STATUS_RE.search(full_rank_text)
+    if status_match:
+        if not additional_parts:
+            base_rank = full_rank_text[:status_match.start()].strip()
+        additional_parts.append(status_match.group(0))
 
     additional = ' '.join(additional_parts) if additional_parts else ""
     return base_rank, additional